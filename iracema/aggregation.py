@@ -29,18 +29,15 @@ def sliding_window(time_series, window_size, hop_size, function=None,
     function : function
         Function to be applied to each window. If no function is specified,
         each window will contain an unaltered excerpt of the time series.
+        Some numpy reductions (``np.sum``, ``np.mean``, ``np.median``,
+        ``np.max``, ``np.min``, ``np.std``, ``np.var`` and ``np.prod``) are
+        called only once, for all the windows, with ``axis=-1``.
     window_name : str
         Name of the window function to be used. Options are: {"boxcar",
         "triang", "blackman", "hamming", "hann", "bartlett", "flattop",
         "parzen", "bohman", "blackmanharris", "nuttall", "barthann",
         "no_window", None}.
     """
-    def identity(x):
-        return x
-
-    if not function:
-        function = identity
-
     new_data = apply_sliding_window(time_series.data, window_size, hop_size,
                                     function, window_name)
 
@@ -1,15 +1,21 @@
 """
 This module contains the implementation of the class ``Audio``.
 """
+from decimal import Decimal
+from fractions import Fraction
+from functools import lru_cache
+
 from librosa.effects import time_stretch, pitch_shift
-import resampy
 import numpy as np
+from scipy.signal import firwin, resample_poly
 
 from iracema.core.timeseries import TimeSeries
 from iracema.io.audiofile import read as _read
-from iracema.io import player
 from iracema.util import conversion
 
+# maximum up / down factor for resampling with a polyphase filter
+_MAX_POLYPHASE_FACTOR = 1000
+
 
 class Audio(TimeSeries):
     """
@@ -19,7 +25,7 @@ class Audio(TimeSeries):
         ``iracema.Audio``.
     """
 
-    def __init__(self, fs, data, start_time=None, caption=None):
+    def __init__(self, fs, data, start_time=None, caption=None, dtype=None):
         """
         Example
         -------
@@ -71,7 +77,14 @@ class Audio(TimeSeries):
         caption : str, optional
             Textual description used for plotting and displaying reports about
             the audio excerpt.
-        """
+        dtype : numpy dtype, optional
+            Data type for the audio samples (e.g. ``np.float32``, which halves
+            the memory used by the data and by the operations over it). The
+            data is stored in a contiguous array of this type. If None, the
+            data array is kept as it is.
+        """
+        if dtype is not None:
+            data = np.ascontiguousarray(data, dtype=dtype)
         unit = 'amplitude'
         self.label = 'waveform'
         self.filename, self.caption = None, caption
@@ -81,7 +94,7 @@ class Audio(TimeSeries):
             fs, data=data, unit=unit, start_time=start_time, caption=caption)
 
     @classmethod
-    def load(cls, file_location, caption=None):
+    def load(cls, file_location, caption=None, dtype=np.float64):
         """
         Load an audio file into an ``Audio`` object.
 
@@ -94,6 +107,9 @@ class Audio(TimeSeries):
         caption : str, optional
             Caption for the audio file loaded (optional). If this argument is
             not provided, the base name of the loaded file will be used.
+        dtype : numpy dtype, optional
+            Floating point type for the audio samples. Use ``np.float32`` to
+            halve the memory used by the data.
 
         Return
         ------
@@ -101,7 +117,7 @@ class Audio(TimeSeries):
             An object of the class ``Audio``, containing the data loaded from
             the specified location.
         """
-        data, fs, base_name = _read(file_location)
+        data, fs, base_name = _read(file_location, dtype=dtype)
         caption = caption or base_name
         audio = cls(fs, data, caption=caption)
         audio.filename = base_name
@@ -118,8 +134,19 @@ class Audio(TimeSeries):
                 'objects with start_time equal to 0.'))
         if self.fs == new_fs:
             return self
-        new = self.copy()
-        new.data = resampy.resample(self.data, float(self.fs), float(new_fs))
+        # polyphase filtering is used when the ratio between the sampling
+        # frequencies can be expressed with small integers (e.g. 44100 -> 48000
+        # is 160 / 147), which is the usual case
+        ratio = Fraction(Decimal(new_fs)) / Fraction(self.fs)
+        up, down = ratio.numerator, ratio.denominator
+        if max(up, down) <= _MAX_POLYPHASE_FACTOR:
+            data = resample_poly(
+                self.data, up, down, axis=-1,
+                window=_polyphase_filter(up, down))
+        else:
+            import resampy
+            data = resampy.resample(self.data, float(self.fs), float(new_fs))
+        new = self._clone_like(data)
         new.fs = new_fs
 
         return new
@@ -132,10 +159,8 @@ class Audio(TimeSeries):
 
         .. _librosa: https://librosa.org
         """
-        new = self.copy()
-        new.data = pitch_shift(new.data, new.fs, n_steps, **kwargs)
-
-        return new
+        return self._clone_like(
+            pitch_shift(self.data, self.fs, n_steps, **kwargs))
 
     def time_stretch(self, rate, **kwargs):
         """
@@ -143,10 +168,7 @@ class Audio(TimeSeries):
 
         This method is a wrapper over librosa_'s ``time_stretch`` method.
         """
-        new = self.copy()
-        new.data = time_stretch(new.data, rate, **kwargs)
-
-        return new
+        return self._clone_like(time_stretch(self.data, rate, **kwargs))
 
     def add_noise(self, db=-50.):
         """
@@ -159,11 +181,8 @@ class Audio(TimeSeries):
             of 1.0 correspoding to 0 dB.
         """
         scale_factor = conversion.db_to_amplitude(db)
-        new = self.copy()
         rand = np.random.uniform(-scale_factor,scale_factor,self.nsamples)
-        new.data = self.data + (rand)
-
-        return new
+        return self._clone_like(self.data + rand)
 
     def plot(self, linewidth=0.1, alpha=0.9, **kwargs):
         """
@@ -177,6 +196,7 @@ class Audio(TimeSeries):
         """
         Play audio from Audio object.
         """
+        from iracema.io import player  # imports sounddevice
         return player.play(self)
 
     def play_with_clicks(self, points):
@@ -184,6 +204,7 @@ class Audio(TimeSeries):
         Play audio mixed with click sounds in the instants corresponding
         to ``points``.
         """
+        from iracema.io import player  # imports sounddevice
         return player.play_with_clicks(self, points)
 
     def mix_clicks(self, points):
@@ -191,18 +212,21 @@ class Audio(TimeSeries):
         Return an audio time series with clicks mixed in the instants
         corresponding to ``points``.
         """
+        from iracema.io import player  # imports sounddevice
         return player.play_with_clicks(self, points, return_time_series=True)
 
     def play_from_time(self, from_time):
         """
         Play audio from Audio object start at time ``from_time``.
         """
+        from iracema.io import player  # imports sounddevice
         return player.play_interval_seconds(self, from_time, None)
 
     def play_segment(self, segment):
         """
         Play segment from Audio obejct.
         """
+        from iracema.io import player  # imports sounddevice
         return player.play_interval_seconds(self, segment.start_time,
                                             segment.end_time)
 
@@ -211,4 +235,17 @@ class Audio(TimeSeries):
         """
         Stop playing audio.
         """
+        from iracema.io import player  # imports sounddevice
         player.stop()
+
+
+@lru_cache(maxsize=16)
+def _polyphase_filter(up, down):
+    """
+    Design the low-pass FIR filter used by ``resample_poly`` for the given
+    factors (the same filter scipy would design). The filter is cached, since
+    the same pair of sampling frequencies is usually used for many files.
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    return firwin(2 * half_len + 1, 1. / max_rate, window=('kaiser', 5.0))
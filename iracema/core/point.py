@@ -19,6 +19,15 @@ class Point(Decimal):
     .. Hint:: This class is also available at the main package level as
         ``iracema.Point``.
     """
+    def __new__(cls, value="0", context=None):
+        # Decimal does not accept NumPy scalars, so they are converted to the
+        # equivalent Python types (no need to call ``.tolist()`` on arrays)
+        if isinstance(value, np.integer):
+            value = int(value)
+        elif isinstance(value, np.floating):
+            value = float(value)
+        return super(Point, cls).__new__(cls, value, context)
+
     def __repr__(self):
         return f"Point({self})"
 
@@ -114,10 +123,12 @@ class PointList(MutableSequence):
         Instantiate a list of points from a list of indexes ``list_indexes``
         and a ``time_series`` object.
         """
-        return cls([
-            Point.from_sample_index(index, time_series)
-            for index in list_indexes
-        ])
+        # the conversion factors are computed only once for the whole list,
+        # and the indexes are converted to Python ints in a single call
+        time_offset = Decimal(time_series.start_time)
+        fs = Decimal(int(time_series.fs))
+        indexes = np.asarray(list_indexes, dtype=np.int64).tolist()
+        return cls([Point(index / fs + time_offset) for index in indexes])
 
     @property
     def time(self):
@@ -160,7 +171,6 @@ class PointList(MutableSequence):
         """
         segments =  iracema.core.segment.SegmentList()
         for pt_start, pt_end in zip(self[0:-1], self[1:]):
-            print('-- ', pt_start, pt_end)
             segments.append(iracema.core.segment.Segment(pt_start, pt_end))
         return segments
     
@@ -2,7 +2,7 @@
 This module contains the implementation of the class TimeSeries.
 """
 
-import copy as cp
+import operator
 from decimal import Decimal
 
 import numpy as np
@@ -11,7 +11,6 @@ from iracema.aggregation import sliding_window
 from iracema.core.segment import Segment
 from iracema.util import conversion
 from iracema.util.dsp import but_filter
-from iracema.plot import line_plot
 
 
 class TimeSeries:
@@ -28,7 +27,7 @@ class TimeSeries:
         Data array sampled at ``fs`` Hz.
     time : numpy array
         Numpy data array containing the time of each sample, relative to the
-        original time reference.
+        original time reference (read-only).
     fs : Decimal
         Sampling frequency for the data.
     nyquist : Decimal
@@ -63,6 +62,9 @@ class TimeSeries:
     caption = ''
     label = ''
 
+    # attributes used to cache results computed from the data
+    _cache_attributes = ('_features_cache', '_db_data_cache', '_time_cache')
+
     def __init__(self, fs, data=None, start_time=None, unit=None,
                  caption=None):
         """
@@ -127,54 +129,105 @@ class TimeSeries:
 
     @property
     def time(self):  # pylint: disable=missing-docstring
-        start = Decimal(self.start_time)
-        step = Decimal(self.duration) / Decimal(self.nsamples)
-
-        return [start + (t * step) for t in range(0, self.nsamples)]
+        # the array is cached while the start time, sampling frequency and
+        # number of samples do not change (so it is read-only)
+        key = (self.start_time, self.fs, self.nsamples)
+        cached = self.__dict__.get('_time_cache')
+        if cached is None or cached[0] != key:
+            time = np.arange(self.nsamples, dtype=np.float64)
+            time *= float(self.ts)
+            time += float(self.start_time)
+            time.flags.writeable = False
+            cached = self._time_cache = (key, time)
+
+        return cached[1]
 
     def copy(self):
         """
-        Return a copy of the time series object (deep copy).
+        Return a copy of the time series object. The data array (and any other
+        numpy array attribute, e.g. the frequencies of spectral time series)
+        is copied; the remaining attributes are shallow copied.
+        """
+        state = self.__getstate__()
+        for name, value in state.items():
+            if isinstance(value, np.ndarray):
+                state[name] = value.copy()
+        ts = object.__new__(self.__class__)
+        ts.__dict__.update(state)
+        return ts
+
+    def __getstate__(self):
+        """
+        Return the state used for copying and pickling the object. Results
+        cached in the object (which are only valid for its current data array)
+        are not included.
+        """
+        state = self.__dict__.copy()
+        for attribute in self._cache_attributes:
+            state.pop(attribute, None)
+        return state
+
+    def _clone_like(self, data):
         """
-        return cp.deepcopy(self)
+        Return a new time series with the same attributes as the current
+        object, but containing the array ``data``. Unlike ``copy()``, the data
+        array of the current object is not copied, and the other attributes
+        are shallow copied.
+        """
+        ts = object.__new__(self.__class__)
+        ts.__dict__.update(self.__getstate__())
+        ts.data = data
+        return ts
 
     def gain(self, db):
         """
         Apply a gain of ``db`` dB to the time series and return the new object.
         """
         scale_factor = conversion.db_to_amplitude(db)
-        new = self.copy()
-        new.data = new.data * scale_factor
-
-        return new
+        return self._clone_like(self.data * scale_factor)
 
     def normalize(self, db=0.0):
         """
         Return a copy of the audio time series, normalized to ``db`` dB.
+        The peak is the maximum absolute value of the data.
         """
-        new = self.copy()
-        new.data = self.data / np.max(self.data)
-        new = new.gain(db)
+        # two reductions find the peak without an array of absolute values
+        peak = max(np.max(self.data), -np.min(self.data))
+        if peak == 0:
+            return self.copy()
 
-        return new
+        # the gain is applied in the same pass as the normalization
+        # (a Python float keeps the dtype of the data, e.g. float32)
+        scale_factor = conversion.db_to_amplitude(db) / float(peak)
+        return self._clone_like(self.data * scale_factor)
 
     def diff(self, n=1):
         "Return the n-th discrete difference for the time series"
+        if n == 1 and self.data.dtype != bool:
+            # the first difference is written straight into the output array
+            # (the sample before the first one is considered to be zero)
+            data_diff = np.empty_like(self.data)
+            data_diff[..., 0] = self.data[..., 0]
+            np.subtract(self.data[..., 1:], self.data[..., :-1],
+                        out=data_diff[..., 1:])
+            if self.nfeatures == 1:
+                data_diff.shape = (self.nsamples, )
+            return self._clone_like(data_diff)
+
         nfeatures = self.nfeatures
         dtype = self.data.dtype
         data = np.reshape(self.data, (nfeatures, -1))
 
-        zero_pre_pad = np.zeros((nfeatures, n), dtype)
-        padded_data = np.concatenate((zero_pre_pad, data), axis=-1)
+        # zero pre-padding, written into a single preallocated array
+        padded_data = np.empty((nfeatures, self.nsamples + n), dtype)
+        padded_data[:, :n] = 0
+        padded_data[:, n:] = data
         data_diff = np.diff(padded_data, n, axis=-1)
 
         if nfeatures == 1:
             data_diff.shape = (self.nsamples, )
 
-        ts = self.copy()
-        ts.data = data_diff
-
-        return ts
+        return self._clone_like(data_diff)
     
 
     def sliding_window(self,
@@ -204,27 +257,21 @@ class TimeSeries:
             "parzen", "bohman", "blackmanharris", "nuttall", "barthann",
             "no_window", None}.
         """
-        ts = self.copy()
-        ts = sliding_window(
-            ts, window_size, hop_size, function=function, window_name=window_name)
-        return ts
+        return sliding_window(
+            self, window_size, hop_size, function=function,
+            window_name=window_name)
 
     def zeros_to_nan(self):
         """
         Converts zeros to np.nan in the data array. Returns a new time series.
         """
-        ts = self.copy()
-        ts.data[self.data == 0] = np.nan
-        return ts
+        # a single pass builds the new data array, instead of copying the
+        # data and then overwriting the zeros
+        return self._clone_like(np.where(self.data == 0, np.nan, self.data))
 
     def hwr(self):
         "Return a half-wave rectified copy of the time series."
-        rectified_data = np.clip(self.data, 0, None)
-
-        ts = self.copy()
-        ts.data = rectified_data
-
-        return ts
+        return self._clone_like(np.maximum(self.data, 0))
 
    
     def pad(self, pre, post, value=0.):
@@ -243,9 +290,8 @@ class TimeSeries:
             'repeat' is provided, the values at the edges will be repeated
             in the padding operation.
         """
-        new = self.copy()
-        first_col = np.expand_dims(new.data[...,0], -1)
-        last_col = np.expand_dims(new.data[..., -1], -1)
+        first_col = np.expand_dims(self.data[..., 0], -1)
+        last_col = np.expand_dims(self.data[..., -1], -1)
         if isinstance(value, str):
             if value == 'repeat':
                 pre_pad_array = np.repeat(first_col, pre, axis=-1)
@@ -258,7 +304,8 @@ class TimeSeries:
             pre_pad_array = np.repeat(pre_pad_array, pre, axis=-1)
             post_pad_array = np.repeat(post_pad_array, post, -1)
 
-        new.data = np.concatenate((pre_pad_array, new.data, post_pad_array), axis=-1)
+        new = self._clone_like(np.concatenate(
+            (pre_pad_array, self.data, post_pad_array), axis=-1))
         new.start_time = new.start_time - new.ts*pre
 
         return new
@@ -275,13 +322,12 @@ class TimeSeries:
             ValueError("The current time series has more samples than the"
                        "given time series.")
         padding_len = timeseries.nsamples - self.nsamples
-        new_ts = self.copy()
         if timeseries.data.ndim == 1:
             padding_array = np.ones(padding_len) * value
         elif timeseries.data.ndim == 2:
             padding_array = np.ones((self.nfeatures, padding_len)) * value
-        new_ts.data = np.concatenate((new_ts.data, padding_array), axis=-1)
-        return new_ts
+        return self._clone_like(
+            np.concatenate((self.data, padding_array), axis=-1))
 
     def resample_and_pad_like(self, timeseries, value=0.):
         """
@@ -301,7 +347,6 @@ class TimeSeries:
         equal to the values in the instance on which the method was called
         (``self``).
         """
-        new_ts = self.copy()
         if self.fs != timeseries.fs:
             raise ValueError(
                 'Incompatible sampling frequencies. Both time series must '
@@ -310,10 +355,10 @@ class TimeSeries:
             raise ValueError(
                 'Incompatible number of samples. Both time series must have '
                 'the same number of samples.')
+        new_ts = self._clone_like(np.vstack((self.data, timeseries.data)))
         new_ts.unit = unit or self.unit
         new_ts.caption = caption or self.caption
         new_ts.start_time = start_time or self.start_time
-        new_ts.data = np.vstack((self.data, timeseries.data))
 
         return new_ts
 
@@ -334,24 +379,32 @@ class TimeSeries:
         filter_order:
             The order of the filter.
         """
-        audio_filtered = self.copy()
-        audio_filtered.data = but_filter(
+        return self._clone_like(but_filter(
             self.data,
             float(self.fs),
             critical_frequency,
             filter_type=filter_type,
-            filter_order=filter_order)
-        return audio_filtered
+            filter_order=filter_order))
 
     def plot(self, linewidth=1, alpha=0.9, **kwargs):
         "Plot the time series using matplotlib."
+        # matplotlib is only imported when something is plotted
+        from iracema.plot import line_plot
         return line_plot(self, linewidth=linewidth, alpha=alpha, **kwargs)
 
     def time_to_sample_index(self, time):
         """
         Convert time (in seconds) to the correspoding sample index in the time
-        series.
-        """
+        series. If an array of times is given, an array of indexes will be
+        returned.
+        """
+        if isinstance(time, np.ndarray):
+            # all the elements are converted at once, in a single temporary
+            # array of floats
+            index = np.add(time, float(self.start_time), dtype=np.float64)
+            index *= float(self.fs)
+            np.rint(index, out=index)
+            return index.astype(np.int64)
         time = time + self.start_time
         index = round(time * self.fs)
         return index
@@ -367,6 +420,10 @@ class TimeSeries:
         """
         Get an excerpt from the time series using slices. Return a new
         TimeSeries object.
+
+        The data array of the excerpt is a view of the data of the original
+        time series (no data is copied), so it should not be modified in
+        place; use ``copy()`` on the excerpt if that is needed.
         """
         if type(sl) == Segment:
             time_offset = sl.start
@@ -379,9 +436,7 @@ class TimeSeries:
             raise ValueError("invalid value for slicing operation: must be " +
                              "of type `Segment` or a Python slice")
 
-        sliced_data = self.data[sl]
-        ts = self.copy()
-        ts.data = sliced_data
+        ts = self._clone_like(self.data[sl])
         ts.start_time += time_offset  # shift start
         return ts
 
@@ -396,109 +451,62 @@ class TimeSeries:
         """
         Calculate the base 10 logarithm of the time series.
         """
-        new = self.copy()
-        new.data = np.log10(self.data)
-        return new
+        return self._clone_like(np.log10(self.data))
 
     # Arithmetic, relational and boolean operations
-    def __add__(self, other):
-        """Add two time series."""
+    def _binop(self, other, op):
+        """
+        Apply the binary operator ``op`` to the data of the current time series
+        and ``other``, element-wise, and return a new time series.
+        """
         if self.data.shape != other.data.shape:
             raise DimensionalityError("The shape of the time series do not "
                                       "match.")
-        ts = self.copy()
-        ts.data = self.data + other.data
-        return ts
+        return self._clone_like(op(self.data, other.data))
+
+    def __add__(self, other):
+        """Add two time series."""
+        return self._binop(other, operator.add)
 
     def __sub__(self, other):
         """Subtract two time series."""
-        if self.data.shape != other.data.shape:
-            raise DimensionalityError("The shape of the time series do not "
-                                      "match.")
-        ts = self.copy()
-        ts.data = self.data - other.data
-        return ts
+        return self._binop(other, operator.sub)
 
     def __mul__(self, other):
         """Multiplicate two time series element-wise."""
-        if self.data.shape != other.data.shape:
-            raise DimensionalityError("The shape of the time series do not "
-                                      "match.")
-        ts = self.copy()
-        ts.data = self.data * other.data
-        return ts
+        return self._binop(other, operator.mul)
 
     def __truediv__(self, other):
         """Divide two time series element-wise."""
-        if self.data.shape != other.data.shape:
-            raise DimensionalityError("The shape of the time series do not "
-                                      "match.")
-        ts = self.copy()
-        ts.data = self.data / other.data
-        return ts
+        return self._binop(other, operator.truediv)
 
     def __mod__(self, other):
         """Division remainder for two time series taken element-wise."""
-        if self.data.shape != other.data.shape:
-            raise DimensionalityError("The shape of the time series do not "
-                                      "match.")
-        ts = self.copy()
-        ts.data = self.data % other.data
-        return ts
+        return self._binop(other, operator.mod)
 
     def __lt__(self, other):
         """Less than"""
-        if self.data.shape != other.data.shape:
-            raise DimensionalityError("The shape of the time series do not "
-                                      "match.")
-        ts = self.copy()
-        ts.data = self.data < other.data
-        return ts
+        return self._binop(other, operator.lt)
 
     def __le__(self, other):
         """Less than or equal to"""
-        if self.data.shape != other.data.shape:
-            raise DimensionalityError("The shape of the time series do not "
-                                      "match.")
-        ts = self.copy()
-        ts.data = self.data <= other.data
-        return ts
+        return self._binop(other, operator.le)
 
     def __gt__(self, other):
         """Greater than"""
-        if self.data.shape != other.data.shape:
-            raise DimensionalityError("The shape of the time series do not "
-                                      "match.")
-        ts = self.copy()
-        ts.data = self.data > other.data
-        return ts
+        return self._binop(other, operator.gt)
 
     def __ge__(self, other):
         """Greater than or equal to"""
-        if self.data.shape != other.data.shape:
-            raise DimensionalityError("The shape of the time series do not "
-                                      "match.")
-        ts = self.copy()
-        ts.data = self.data >= other.data
-        return ts
+        return self._binop(other, operator.ge)
 
     def __eq__(self, other):
         """Equal to"""
-        if self.data.shape != other.data.shape:
-            raise DimensionalityError("The shape of the time series do not "
-                                      "match.")
-        ts = self.copy()
-        ts.data = self.data == other.data
-        return ts
+        return self._binop(other, operator.eq)
 
     def __ne__(self, other):
         """Not equal to"""
-        if self.data.shape != other.data.shape:
-            raise DimensionalityError("The shape of the time series do not "
-                                      "match.")
-        ts = self.copy()
-        ts.data = self.data != other.data
-        return ts
+        return self._binop(other, operator.ne)
 
     def __len__(self):
         """Length of the time series -- number of samples."""
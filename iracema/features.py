@@ -28,6 +28,9 @@ References
    & McAdams, S. (2011). The timbre toolbox: extracting audio features
    from musical signals, 130(5).
 """
+from decimal import Decimal
+from functools import wraps
+
 import numpy as np
 from scipy.stats import pearsonr, gmean  # pylint: disable=import-error
 
@@ -37,8 +40,42 @@ from iracema.aggregation import (aggregate_features,
                                  aggregate_sucessive_samples,
                                  sliding_window)
 from iracema.util.dsp import hwr
-
-
+from iracema.util.windowing import get_sliding_window_view
+import iracema.core.timeseries
+
+
+def _cache_in_time_series(function):
+    """
+    Decorator that adds the optional argument ``cache`` to
+    ``function(time_series, ...)``. If ``cache`` is True, the results are
+    stored in the ``time_series`` object, so that successive calls with the
+    same arguments (e.g. the RMS computed for plotting and for segmenting the
+    same audio) do not recalculate them. The cached results are discarded if
+    the data array, the sampling frequency or the start time of
+    ``time_series`` is replaced, but in-place modifications of the data array
+    are not detected. Copies of the cached results are returned, so callers
+    might modify them freely.
+    """
+    @wraps(function)
+    def wrapper(time_series, *args, cache=False, **kwargs):
+        if not cache:
+            return function(time_series, *args, **kwargs)
+
+        results = time_series.__dict__.setdefault('_features_cache', {})
+        key = (function.__name__, args, tuple(sorted(kwargs.items())))
+        time_base = (time_series.fs, time_series.start_time)
+        cached = results.get(key)
+        if (cached is None or cached[0] is not time_series.data
+                or cached[1] != time_base):
+            cached = (time_series.data, time_base,
+                      function(time_series, *args, **kwargs))
+            results[key] = cached
+        return cached[2].copy()
+
+    return wrapper
+
+
+@_cache_in_time_series
 def peak_envelope(time_series, window_size, hop_size):
     """
     Calculate the peak envelope of a time series
@@ -56,16 +93,27 @@ def peak_envelope(time_series, window_size, hop_size):
         An audio time-series object.
     window_size : int
     hop_size : int
-    """
-    def function(x):
-        return np.max(np.abs(x))
-
-    time_series = sliding_window(time_series, window_size, hop_size, function)
+    cache : bool, optional
+        Whether or not to store the result in ``time_series`` and reuse it in
+        later calls with the same arguments. In-place modifications of the
+        data of ``time_series`` are not detected, so they must not be used
+        with this option.
+    """
+    # the peaks of all the windows are calculated at once, with two reductions
+    # over a view of the sliding windows (no array of absolute values)
+    windows = get_sliding_window_view(time_series.data, window_size, hop_size)
+    data = np.maximum(np.max(windows, axis=-1), -np.min(windows, axis=-1))
+
+    time_series = iracema.core.timeseries.TimeSeries(
+        Decimal(time_series.fs) / Decimal(hop_size),
+        data=data,
+        start_time=time_series.start_time)
     time_series.label = 'PeakEnvelope'
     time_series.unit = 'amplitude'
     return time_series
 
 
+@_cache_in_time_series
 def rms(time_series, window_size, hop_size):
     """
     Calculate the root mean square of a time series
@@ -83,11 +131,21 @@ def rms(time_series, window_size, hop_size):
         A time-series object. It is usually applied on Audio objects.
     window_size : int
     hop_size : int
-    """
-    def function(x):
-        return np.sqrt(np.mean(x**2))
-
-    time_series = sliding_window(time_series, window_size, hop_size, function)
+    cache : bool, optional
+        Whether or not to store the result in ``time_series`` and reuse it in
+        later calls with the same arguments. In-place modifications of the
+        data of ``time_series`` are not detected, so they must not be used
+        with this option.
+    """
+    # the sum of squares of every window is calculated at once over a view of
+    # the sliding windows, instead of calling a function for each window
+    windows = get_sliding_window_view(time_series.data, window_size, hop_size)
+    data = np.sqrt(np.einsum('ij,ij->i', windows, windows) / window_size)
+
+    time_series = iracema.core.timeseries.TimeSeries(
+        Decimal(time_series.fs) / Decimal(hop_size),
+        data=data,
+        start_time=time_series.start_time)
     time_series.label = 'RMS'
     time_series.unit = 'amplitude'
     return time_series
@@ -14,7 +14,7 @@ import scipy.io.wavfile
 from w3lib.url import canonicalize_url
 from w3lib.url import file_uri_to_path
 
-def read(file_location):
+def read(file_location, dtype=np.float64):
     """
     Read audio file from the local file system or download it from URL.
 
@@ -22,6 +22,8 @@ def read(file_location):
     ---------
     file_location: str
         Path or URL to the file that will be loaded.
+    dtype: numpy dtype
+        Floating point type of the returned data array.
 
     Return
     ------
@@ -57,15 +59,14 @@ def read(file_location):
             frame_int = np.frombuffer(frame, np.dtype('int16'))
             data_int = np.concatenate((data_int, frame_int), axis=0)
         # convert data to float
-        data = data_int.astype(
-            np.float_, casting='safe')  # pylint: disable=maybe-no-member
+        data = data_int.astype(dtype)
 
         # Conversion to mono (mix both channels)
         if channels > 1:
             data = data.reshape((-1, channels)).T
             data = np.mean(data, axis=0)
 
-        data = data / intmaxabs
+        data /= intmaxabs
 
     if temp_file:
         temp_file.close()
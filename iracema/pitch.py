@@ -309,7 +309,6 @@ def crepe(audio,
     frequency[confidence < min_confidence] = np.nan
 
     step = time[1] - time[0]
-    print('step =', step)
     fs = 1. / step
     pitch_time_series = TimeSeries(
         fs, frequency, start_time=audio.start_time, unit='Hz')
@@ -332,8 +331,11 @@ def pitch_filter(pitch_time_series, delta_max=0.04):
         A smoothed pitch time series.
     """
     data = pitch_time_series.data
-    data_previous = np.concatenate((np.zeros(1), data[0:-1]))
-    data_next = np.concatenate((data[1:], np.zeros(1)))
+    # pitch curve shifted by one sample in each direction (zero padded)
+    data_previous = np.zeros_like(data)
+    data_previous[1:] = data[:-1]
+    data_next = np.zeros_like(data)
+    data_next[:-1] = data[1:]
 
     pitch_filtered = pitch_time_series.copy()
 
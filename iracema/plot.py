@@ -15,16 +15,44 @@ from iracema.util import conversion
 DEFAULT_FIG_SIZE = (9, 9)
 
 
-def line_plot(time_series, linewidth=1, alpha=0.9, figsize=None, **kwargs):
+def _init_figure(fig=None, figsize=None):
     """
-    Plot the time series using matplotlib.
-    Line width and alpha values can be set as optional parameters.
+    Return the figure in which the plots will be drawn. If an existing ``fig``
+    is provided, it will be cleared and reused, instead of allocating a new
+    figure (and canvas) for each call.
     """
+    if fig is not None:
+        fig.clf()
+        return fig
     if not figsize:
         figsize = DEFAULT_FIG_SIZE
-    f = plt.figure(figsize=figsize)
+    return plt.figure(figsize=figsize)
+
+
+def _show_figure(f, reused=False, block=False):
+    """
+    Show the figure ``f``. Reused figures will only have their canvas redrawn.
+    New figures are shown with ``plt.show()`` if ``block`` is True (which
+    runs the event loop of the GUI backends), or with ``f.show()`` otherwise.
+    """
+    if reused:
+        f.canvas.draw_idle()
+    elif block:
+        plt.show()
+    else:
+        f.show()
+
+
+def line_plot(time_series, linewidth=1, alpha=0.9, figsize=None, fig=None,
+              **kwargs):
+    """
+    Plot the time series using matplotlib.
+    Line width and alpha values can be set as optional parameters.
+    """
+    f = _init_figure(fig, figsize)
+    axes = f.subplots(1)
 
-    plt.plot(
+    axes.plot(
         time_series.time,
         time_series.data,
         label=time_series.label,
@@ -32,11 +60,12 @@ def line_plot(time_series, linewidth=1, alpha=0.9, figsize=None, **kwargs):
         alpha=alpha,
         **kwargs)
     if time_series.label:
-        plt.legend(loc='lower right', ncol=2, fontsize='x-small')
-    plt.title(time_series.caption)
-    plt.ylabel(time_series.unit)
-    plt.xlabel('time (s)')
-    plt.show()
+        axes.legend(loc='lower right', ncol=2, fontsize='x-small')
+    axes.set_title(time_series.caption)
+    axes.set_ylabel(time_series.unit)
+    axes.set_xlabel('time (s)')
+
+    _show_figure(f, reused=fig is not None, block=True)
 
     return f
 
@@ -47,25 +76,24 @@ def spectrogram(spec_ts,
                 fmax=None,
                 figsize=None,
                 normalize=True,
-                cmap='viridis'):
+                cmap='viridis',
+                fig=None):
     """
     Plot the spectrogram of the audio signal.
     """
     # configuring figure and subplots
-    if not figsize:
-        figsize = DEFAULT_FIG_SIZE
-    f = plt.figure(figsize=figsize)
+    f = _init_figure(fig, figsize)
 
     ax = f.subplots(1)
 
-    plt.subplots_adjust(hspace=0.05)
+    f.subplots_adjust(hspace=0.05)
 
     # plotting spectrogram
     _add_spectrogram_to_axes(
         ax, spec_ts, log, fmin=fmin, fmax=fmax, normalize=normalize, cmap=cmap)
 
     # show the resulting image
-    f.show()
+    _show_figure(f, reused=fig is not None)
 
     return f
 
@@ -77,21 +105,20 @@ def waveform_spectrogram(audio,
                          peak_envelope=None,
                          fmin=0.,
                          fmax=None,
-                         figsize=None):
+                         figsize=None,
+                         fig=None):
     """
     Plot two graphs: the first one showing curves for the ``audio`` waveform,
     the ``rms`` and the ``peak_envelope``; the second showing the spectrogram
     of the audio signal.
     """
     # configuring figure and subplots
-    if not figsize:
-        figsize = DEFAULT_FIG_SIZE
-    f = plt.figure(figsize=figsize)
+    f = _init_figure(fig, figsize)
 
     (ax1, ax2) = f.subplots(
         2, sharex=True, gridspec_kw={'height_ratios': [1, 3.5]})
 
-    plt.subplots_adjust(hspace=0.05)
+    f.subplots_adjust(hspace=0.05)
 
     # plotting curves
     _add_waveform_trio_to_axes(ax1, audio, rms, peak_envelope)
@@ -100,7 +127,7 @@ def waveform_spectrogram(audio,
     _add_spectrogram_to_axes(ax2, spec_ts, log, fmin=fmin, fmax=fmax)
 
     # show the resulting image
-    f.show()
+    _show_figure(f, reused=fig is not None)
 
     return f
 
@@ -114,21 +141,20 @@ def waveform_spectrogram_pitch(audio,
                                fmin=0.,
                                fmax=None,
                                cmap='viridis',
-                               figsize=None):
+                               figsize=None,
+                               fig=None):
     """
     Plot two graphs: the first one showing curves for the ``audio`` waveform,
     the ``rms`` and the ``peak_envelope``; the second showing the spectrogram
     of the audio signal and its fundamental frequency  `pitch`.
     """
     # configuring figure and subplots
-    if not figsize:
-        figsize = DEFAULT_FIG_SIZE
-    f = plt.figure(figsize=figsize)
+    f = _init_figure(fig, figsize)
 
     (ax1, ax2) = f.subplots(
         2, sharex=True, gridspec_kw={'height_ratios': [1, 3.5]})
 
-    plt.subplots_adjust(hspace=0.05)
+    f.subplots_adjust(hspace=0.05)
 
     # plotting curves
     _add_waveform_trio_to_axes(ax1, audio, rms, peak_envelope)
@@ -141,7 +167,7 @@ def waveform_spectrogram_pitch(audio,
     _add_curve_to_axes(ax2, pitch, fmt='r', ymin=fmin, ymax=fmax)
 
     # show the resulting image
-    f.show()
+    _show_figure(f, reused=fig is not None)
 
     return f
 
@@ -156,21 +182,20 @@ def waveform_spectrogram_harmonics(audio,
                                    fmax=None,
                                    normalize=True,
                                    cmap='viridis',
-                                   figsize=None):
+                                   figsize=None,
+                                   fig=None):
     """
     Plot two graphs: the first one showing curves for the ``audio`` waveform,
     the ``rms`` and the ``peak_envelope``; the second showing the spectrogram
     of the audio signal and its `harmonics`.
     """
     # configuring figure and subplots
-    if not figsize:
-        figsize = DEFAULT_FIG_SIZE
-    f = plt.figure(figsize=figsize)
+    f = _init_figure(fig, figsize)
 
     (ax1, ax2) = f.subplots(
         2, sharex=True, gridspec_kw={'height_ratios': [1, 3.5]})
 
-    plt.subplots_adjust(hspace=0.05)
+    f.subplots_adjust(hspace=0.05)
 
     # plotting curves
     _add_waveform_trio_to_axes(
@@ -194,51 +219,49 @@ def waveform_spectrogram_harmonics(audio,
     _add_curve_to_axes(ax2, harmonics, fmt='r', ymin=fmin, ymax=fmax)
 
     # show the resulting image
-    f.show()
+    _show_figure(f, reused=fig is not None)
 
     return f
 
 
-def waveform_and_notes(audio, notes, figsize=None):
+def waveform_and_notes(audio, notes, figsize=None, fig=None):
     """
     Plot waveform and note segments.
     """
     # configuring figure and subplots
-    if not figsize:
-        figsize = DEFAULT_FIG_SIZE
-    f = plt.figure(figsize=figsize)
+    f = _init_figure(fig, figsize)
 
     axes = f.subplots(1)
 
     _add_waveform_to_axes(axes, audio)
     _add_notes_to_axes(axes, notes)
 
-    f.show()
+    _show_figure(f, reused=fig is not None)
 
 
-def waveform_trio(audio, rms=None, peak_envelope=None, figsize=None):
+def waveform_trio(audio, rms=None, peak_envelope=None, figsize=None,
+                  fig=None):
     """
     Plot a graph showing curves for the ``audio`` waveform, the ``rms`` and the
     ``peak_envelope``.
     """
     # configuring figure and subplots
-    if not figsize:
-        figsize = DEFAULT_FIG_SIZE
-    plt.figure(figsize=figsize)
+    f = _init_figure(fig, figsize)
 
-    axes = plt.axes()
+    axes = f.subplots(1)
 
     # add waveform trio to first axes
     _add_waveform_trio_to_axes(axes, audio, rms, peak_envelope)
 
-    plt.show()
+    _show_figure(f, reused=fig is not None, block=True)
 
 
 def waveform_trio_and_features(audio,
                                rms=None,
                                peak_envelope=None,
                                features=(),
-                               figsize=None):
+                               figsize=None,
+                               fig=None):
     """
     Plot a graph showing curves for the ``audio`` waveform, the ``rms`` and the
     ``peak_envelope``; followed by a series of graphs, one for each time-series
@@ -248,13 +271,11 @@ def waveform_trio_and_features(audio,
         raise ValueError("the features to be plotted were not specified")
 
     # configuring figure and subplots
-    if not figsize:
-        figsize = DEFAULT_FIG_SIZE
-    f = plt.figure(figsize=figsize)
+    f = _init_figure(fig, figsize)
 
     axes_list = f.subplots(len(features) + 1, sharex=True)
 
-    plt.subplots_adjust(hspace=0.05)
+    f.subplots_adjust(hspace=0.05)
 
     # add audio to first axes
     _add_waveform_trio_to_axes(axes_list[0], audio, rms, peak_envelope)
@@ -264,9 +285,10 @@ def waveform_trio_and_features(audio,
         _add_curve_to_axes(axes_list[i], feature, label=feature.label)
         axes_list[i].legend(loc='lower right', fontsize='x-small')
 
-    MultiCursor(f.canvas, axes_list, color='gray', lw=1)
+    # keep a reference to the cursor, otherwise it is garbage collected
+    f.multi_cursor = MultiCursor(f.canvas, axes_list, color='gray', lw=1)
 
-    plt.show()
+    _show_figure(f, reused=fig is not None, block=True)
 
     return f
 
@@ -276,11 +298,10 @@ def waveform_trio_features_and_points(audio,
                                       point_list,
                                       rms=None,
                                       peak_envelope=None,
-                                      figsize=None):
+                                      figsize=None,
+                                      fig=None):
     # configuring figure and subplots
-    if not figsize:
-        figsize = DEFAULT_FIG_SIZE
-    f = plt.figure(figsize=figsize)
+    f = _init_figure(fig, figsize)
 
     axes_list = f.subplots(2, sharex=True)
 
@@ -294,9 +315,12 @@ def waveform_trio_features_and_points(audio,
     _add_points_to_axes(axes_list[1], point_list.time,
                         point_list.get_values(feature))
 
-    MultiCursor(f.canvas, axes_list, color='gray', lw=1)
+    # keep a reference to the cursor, otherwise it is garbage collected
+    f.multi_cursor = MultiCursor(f.canvas, axes_list, color='gray', lw=1)
 
-    f.show()
+    _show_figure(f, reused=fig is not None)
+
+    return f
 
 
 def _add_notes_to_axes(axes, notes):
@@ -336,9 +360,13 @@ def _add_curve_to_axes(axes,
             label=label)
 
     else:
-        for row in time_series.data:
-            axes.plot(
-                time_series.time, row, fmt, linewidth=linewidth, alpha=alpha)
+        # a single call creates one line per feature (column of data.T)
+        axes.plot(
+            time_series.time,
+            np.asarray(time_series.data).T,
+            fmt,
+            linewidth=linewidth,
+            alpha=alpha)
     
     axes.set_ylim([ymin, ymax])
 
@@ -369,10 +397,10 @@ def _add_waveform_trio_to_axes(axes,
     ``peak_evelope``. This method adds them to ``axes``.
     """
     window_size, hop_size = 2048, 512
-    rms = rms or rms_(audio, window_size, hop_size)
-    peak_envelope =\
-        peak_envelope or peak_envelope_(audio, window_size,
-                                                   hop_size)
+    if rms is None:
+        rms = rms_(audio, window_size, hop_size)
+    if peak_envelope is None:
+        peak_envelope = peak_envelope_(audio, window_size, hop_size)
     # adding the curves
     _add_curve_to_axes(axes, audio, linewidth=None, alpha=0.9)
     _add_curve_to_axes(axes, rms, fmt='r', label=rms.label, set_labels=False)
@@ -387,6 +415,41 @@ def _add_waveform_trio_to_axes(axes,
         axes.legend(loc='lower right', ncol=2, fontsize='x-small')
 
 
+def _spectrogram_db_data(spec):
+    """
+    Return the data of the spectrogram ``spec`` converted to dB, for plotting.
+
+    The result is cached in the object, so it will not be recomputed when the
+    same spectrogram is plotted again (e.g. using a different frequency
+    range). The cache is discarded if ``spec.data`` is replaced by another
+    array, but not if the array is modified in place.
+    """
+    cache = getattr(spec, '_db_data_cache', None)
+    if cache is not None and cache[0] is spec.data:
+        return cache[1]
+
+    # single precision is enough for displaying the image, and halves the
+    # amount of memory traversed by the dB conversion
+    data = spec.data
+    if np.iscomplexobj(data):
+        data = data.astype(np.complex64, copy=False)
+        power_data = np.square(data.real)
+        power_data += np.square(data.imag)
+        # same floor used by ``amplitude_to_db`` for the magnitude
+        db_data = conversion.energy_to_db(power_data, clip_min=1.e-10)
+    else:
+        db_data = data.astype(np.float32, copy=False)
+        # if the data is not in dB, convert it
+        if not spec._db:
+            if spec._power == 1.0:
+                db_data = conversion.amplitude_to_db(db_data)
+            elif spec._power == 2.0:
+                db_data = conversion.energy_to_db(db_data)
+
+    spec._db_data_cache = (spec.data, db_data)
+    return db_data
+
+
 def _add_spectrogram_to_axes(axes,
                              spec,
                              log=False,
@@ -411,23 +474,7 @@ def _add_spectrogram_to_axes(axes,
     freq_indexes = np.logical_and(spec.frequencies >= fmin,
                                   spec.frequencies <= fmax)
 
-    data = spec.data
-    if np.any(np.iscomplex(data)):
-        data = np.abs(data)
-        power = 1.
-        db = False
-    else:
-        power = spec._power
-        db = spec._db
-
-    # if the data is not in dB, convert it
-    if not db:
-        if power == 1.0:
-            data = conversion.amplitude_to_db(data)
-        elif power == 2.0:
-            data = conversion.energy_to_db(data)
-
-    data = data[freq_indexes, :]
+    data = _spectrogram_db_data(spec)[freq_indexes, :]
 
     if isinstance(normalize, bool) or normalize is None:
         if normalize:
@@ -441,7 +488,7 @@ def _add_spectrogram_to_axes(axes,
             )
         vmin, vmax = normalize
 
-    plt.pcolormesh(
+    axes.pcolormesh(
         spec.time,
         spec.frequencies[freq_indexes],
         data,
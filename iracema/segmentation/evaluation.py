@@ -1,3 +1,6 @@
+from functools import partial
+from multiprocessing import Pool
+
 import numpy as np
 
 
@@ -5,6 +8,10 @@ def evaluate_onsets(targets, predictions, tolerance=0.01):
     """
     Evaluation metrics for onset detection methods.
 
+    Each target can be matched to a single prediction (and vice versa). The
+    pairs are matched greedily, starting from the closest ones, as long as
+    they are within the tolerance distance.
+
     Arguments
     ---------
     target : numpy array
@@ -19,35 +26,62 @@ def evaluate_onsets(targets, predictions, tolerance=0.01):
     metrics : dict
         A dictionary with the calculated metrics.
     """
-    # generate distances matrix between targets and predictions
-    mesh = np.array(np.meshgrid(targets, predictions))
-    combinations = mesh.T.reshape(-1, len(predictions), 2)
-    distances = np.abs(np.diff(combinations, axis=2)).squeeze()
+    targets = np.asarray(targets, dtype=float)
+    predictions = np.asarray(predictions, dtype=float)
+
+    if targets.size == 0 or predictions.size == 0:
+        # nothing to be matched
+        return _onset_metrics(0, len(targets), len(predictions))
+
+    # search the sorted predictions for the ones within the tolerance window
+    # of each target, instead of calculating all the pairwise distances
+    order = np.argsort(predictions, kind='stable')
+    sorted_predictions = predictions[order]
+    lo = np.searchsorted(sorted_predictions, targets - tolerance, side='left')
+    hi = np.searchsorted(sorted_predictions, targets + tolerance, side='right')
+    counts = hi - lo
+
+    # candidate pairs (target, prediction)
+    ix_targets = np.repeat(np.arange(len(targets)), counts)
+    ix_sorted = (np.arange(np.sum(counts)) -
+                 np.repeat(np.cumsum(counts) - counts, counts) +
+                 np.repeat(lo, counts))
+    ix_predictions = order[ix_sorted]
+    distances = np.abs(targets[ix_targets] - predictions[ix_predictions])
 
     # search for best matches within the tolerance distance
-    target_found = np.full(len(targets), np.nan)
-    while True:
-        ix_min_dist = np.unravel_index(
-            np.argmin(distances, axis=None), distances.shape)
-        distance = distances[ix_min_dist]
-        if np.isnan(target_found[ix_min_dist[0]]):
-            target_found[ix_min_dist[0]] = ix_min_dist[1]
-        distances[ix_min_dist] = np.inf
-        if distance > tolerance:
+    target_found = np.zeros(len(targets), dtype=bool)
+    prediction_found = np.zeros(len(predictions), dtype=bool)
+    for k in np.argsort(distances, kind='stable'):
+        if distances[k] > tolerance:
             break
+        ix_t, ix_p = ix_targets[k], ix_predictions[k]
+        if not (target_found[ix_t] or prediction_found[ix_p]):
+            target_found[ix_t] = True
+            prediction_found[ix_p] = True
+
+    true_positives = int(np.sum(target_found))
+    false_negatives = len(targets) - true_positives
+    false_positives = len(predictions) - true_positives
 
-    arange_predictions = np.arange(0, len(predictions))
-    true_positives = np.sum(~np.isnan(target_found))
-    false_negatives = np.sum(np.isnan(target_found))
-    false_positives = len(
-        np.setdiff1d(
-            arange_predictions,
-            target_found[~np.isnan(target_found)],
-            assume_unique=True))
+    return _onset_metrics(true_positives, false_negatives, false_positives)
 
-    precision = true_positives / (true_positives + false_positives)
-    recall = true_positives / (true_positives + false_negatives)
-    fmeasure = (2 * precision * recall) / (precision + recall)
+
+def _onset_metrics(true_positives, false_negatives, false_positives):
+    """
+    Calculate the evaluation metrics from the number of true positives, false
+    negatives and false positives. The metrics for which the denominator is
+    zero are set to zero.
+    """
+    n_predictions = true_positives + false_positives
+    n_targets = true_positives + false_negatives
+
+    precision = true_positives / n_predictions if n_predictions else 0.
+    recall = true_positives / n_targets if n_targets else 0.
+    if precision + recall:
+        fmeasure = (2 * precision * recall) / (precision + recall)
+    else:
+        fmeasure = 0.
 
     metrics = {
         'true_positives': true_positives,
@@ -59,3 +93,35 @@ def evaluate_onsets(targets, predictions, tolerance=0.01):
     }
 
     return metrics
+
+
+def evaluate_onsets_batch(targets_list, predictions_list, tolerance=0.01,
+                          n_workers=None):
+    """
+    Evaluate the onsets for several excerpts, using a pool of worker
+    processes.
+
+    Arguments
+    ---------
+    targets_list : list
+        List of numpy arrays with the target onsets for each excerpt.
+    predictions_list : list
+        List of numpy arrays with the predicted onsets for each excerpt.
+    tolerance : float
+        Maximum time tolerance in seconds.
+    n_workers : int
+        Number of worker processes. If None, the number of CPUs will be used.
+
+    Returns
+    -------
+    metrics_list : list
+        List of dictionaries with the calculated metrics for each excerpt.
+    """
+    if len(targets_list) != len(predictions_list):
+        raise ValueError("the number of targets and predictions must be the "
+                         "same")
+
+    with Pool(n_workers) as pool:
+        return pool.starmap(
+            partial(evaluate_onsets, tolerance=tolerance),
+            zip(targets_list, predictions_list))
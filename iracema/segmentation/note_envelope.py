@@ -9,7 +9,6 @@ import iracema.spectral
 import iracema.pitch
 
 from iracema.core.point import Point
-from iracema.core.segment import Segment
 
 
 def segment_notes(audio, onsets, window=1024, hop=441):
@@ -48,43 +47,44 @@ def segment_notes(audio, onsets, window=1024, hop=441):
     rms = iracema.features.rms(audio, window, hop)
     spf_diff = iracema.features.spectral_flux(stft)
 
-    note_list = []
-    for onset_0, onset_1 in zip(onsets[0:-1], onsets[1:]):
-        ioi = Segment(onset_0, onset_1)
-        this_spf_dif = spf_diff[ioi]
+    # the curves are sliced using sample indexes, instead of slicing the time
+    # series objects (which would copy them for every note); the indexes of
+    # the onsets are mapped only once for each curve
+    spf_diff_data, spf_diff_fs = spf_diff.data, spf_diff.fs
+    rms_data, rms_fs = rms.data, rms.fs
+    pitch_diff_data, pitch_diff_fs = pitch_diff.data, pitch_diff.fs
+    ixs_spf_diff = [onset.map_index(spf_diff) for onset in onsets]
+    ixs_rms = [onset.map_index(rms) for onset in onsets]
+    ixs_pitch_diff = [onset.map_index(pitch_diff) for onset in onsets]
 
+    note_list = []
+    for i, (onset_0, onset_1) in enumerate(zip(onsets[0:-1], onsets[1:])):
         # release
-        release_start = (
-            onset_0 + (np.argmax(this_spf_dif.data) / this_spf_dif.fs)
-        )
-
-        this_rms = rms[ioi]
-        this_pitch_diff = pitch_diff[ioi]
+        this_spf_dif = spf_diff_data[ixs_spf_diff[i]:ixs_spf_diff[i + 1]]
+        release_start = onset_0 + (np.argmax(this_spf_dif) / spf_diff_fs)
 
         release_start_point = Point(release_start)
 
         # attack
-        seg_onset_release = Segment(onset_0, release_start)
-        rms_onset_release = this_rms[seg_onset_release]
-        if rms_onset_release.nsamples <= 1:
+        rms_onset_release = rms_data[
+            ixs_rms[i]:release_start_point.map_index(rms)]
+        if rms_onset_release.size <= 1:
             attack_end = release_start
         else:
-            attack_end = (
-                onset_0 + (np.argmax(rms_onset_release.data) / this_rms.fs)
-            )
+            attack_end = onset_0 + (np.argmax(rms_onset_release) / rms_fs)
 
         attack_end_point = Point(attack_end)
 
         # offset
-        seg_release_end_ioi = Segment(release_start, onset_1)
-        pitch_diff_end = this_pitch_diff[seg_release_end_ioi]
+        pitch_diff_end = pitch_diff_data[
+            release_start_point.map_index(pitch_diff):ixs_pitch_diff[i + 1]]
 
-        pitch_change_idxs = np.where(pitch_diff_end.data > 0.5)[0]
+        pitch_change_idxs = np.where(pitch_diff_end > 0.5)[0]
         if not np.any(pitch_change_idxs):
             offset = onset_1
         else:
             idx = pitch_change_idxs[0] - 1
-            offset = release_start +(idx / this_pitch_diff.fs)
+            offset = release_start + (idx / pitch_diff_fs)
 
         offset_point = Point(offset)
 
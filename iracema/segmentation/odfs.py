@@ -1,10 +1,13 @@
+from decimal import Decimal
+
 import matplotlib.pyplot as plt
 import numpy as np
 
 import iracema.features
 import iracema.pitch
 import iracema.spectral
-from iracema.aggregation import aggregate_sucessive_samples
+from iracema.core.timeseries import TimeSeries
+from iracema.util.windowing import calculate_sliding_window_parms
 
 
 def odf_adaptative_rms(audio,
@@ -12,7 +15,8 @@ def odf_adaptative_rms(audio,
                      short_window=512,
                      hop=512,
                      alpha=0.1,
-                     display_plot_rms=False):
+                     display_plot_rms=False,
+                     dtype=np.float64):
     """
     Arguments
     ---------
@@ -28,36 +32,27 @@ def odf_adaptative_rms(audio,
         Reduction factor for the long term RMS curve.
     display_plot_rms: bool
         Whether of not to plot the RMS curves.
+    dtype : numpy dtype
+        Data type for the calculation of the ODF. Single precision
+        (``np.float32``) halves the memory traffic, and is usually accurate
+        enough for picking the peaks.
 
     Return
     ------
     odf: TimeSeries
         Onset detection function.
     """
-    rms_long = iracema.features.rms(audio, long_window, hop)
-    rms_short = iracema.features.rms(audio, short_window, hop)\
-        .pad_like(rms_long)
-
-    rms_long.data = rms_long.data * (1 - alpha)
-    rms_diff = (rms_long - rms_short).hwr()
-
-    odf = rms_diff.copy()
-    odf.data = np.zeros_like(rms_diff.data)
-
-    last, sum_, pk, ix_pk = 0, 0, 0, 0
-    it = np.nditer(rms_diff.data, flags=['f_index'])
-    for x in it:
-        if x > 0:
-            sum_ += x
-            if x > pk:
-                pk = x
-                ix_pk = it.index
-        else:
-            if last > 0:
-                odf.data[ix_pk] = sum_
-            sum_ = 0
-            pk = 0
-        last = x
+    rms_long, rms_short = _rms_shared_cumsum(audio, (long_window, short_window),
+                                             hop)
+    rms_short = rms_short.pad_like(rms_long)
+    rms_short.data = rms_short.data.astype(dtype, copy=False)
+
+    rms_long.data = rms_long.data.astype(dtype, copy=False) * (1 - alpha)
+    # the difference is a new time series, so it is half-wave rectified and
+    # turned into the ODF in place, instead of copying it again
+    odf = rms_long - rms_short
+    np.maximum(odf.data, 0, out=odf.data)
+    odf.data = _accumulate_positive_runs(odf.data)
 
     if display_plot_rms:
         plt.plot(rms_long.time, rms_long.data, linewidth=0.5, color='r')
@@ -66,7 +61,89 @@ def odf_adaptative_rms(audio,
     return odf
 
 
-def odf_rms_derivative(audio, window=1024, hop=512):
+def _rms_shared_cumsum(audio, window_sizes, hop):
+    """
+    Calculate the RMS of ``audio`` for each one of the given window sizes,
+    using the same ``hop``. The frames are the same ones used by
+    ``iracema.features.rms``, but the sum of the squared samples within each
+    frame is obtained from a cumulative sum, which is calculated only once
+    and shared by all the window sizes.
+
+    The cumulative sum is always accumulated in double precision, since in
+    single precision the differences between its (large) values would be
+    dominated by rounding errors for quiet frames. The RMS curves are cast
+    back to the floating point type of the audio data.
+    """
+    data = audio.data
+    cumsum = np.concatenate(
+        ([0.], np.cumsum(np.square(data), dtype=np.float64)))
+    if np.issubdtype(data.dtype, np.floating):
+        rms_dtype = data.dtype
+    else:
+        rms_dtype = np.float64
+    new_fs = Decimal(audio.fs) / Decimal(hop)
+
+    rms_list = []
+    for window_size in window_sizes:
+        pre_padding_size, _, num_hops = calculate_sliding_window_parms(
+            window_size, hop, data.size)
+        starts = np.arange(num_hops) * hop - pre_padding_size
+        ends = np.clip(starts + window_size, 0, data.size)
+        starts = np.clip(starts, 0, data.size)
+        # rounding errors in the cumulative sum might yield tiny negative
+        # values for silent frames
+        sums = np.clip(cumsum[ends] - cumsum[starts], 0, None)
+
+        rms = TimeSeries(new_fs,
+                         data=np.sqrt(sums / window_size).astype(
+                             rms_dtype, copy=False),
+                         start_time=audio.start_time,
+                         unit='amplitude')
+        rms.label = 'RMS'
+        rms_list.append(rms)
+
+    return rms_list
+
+
+def _accumulate_positive_runs(data):
+    """
+    Sum the values within each run of successive positive samples in
+    ``data``, and place the result at the position of the peak of the run
+    (the first one, in case of ties). All the other samples will be zero.
+    Runs that reach the end of the array are discarded.
+    """
+    nsamples = data.shape[-1]
+    accumulated = np.zeros_like(data)
+
+    # boundaries of the runs of positive samples (the ends are exclusive)
+    positive = np.concatenate(([False], data > 0, [False]))
+    edges = np.diff(positive.astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if ends.size and ends[-1] == nsamples:
+        starts, ends = starts[:-1], ends[:-1]
+    if not starts.size:
+        return accumulated
+
+    bounds = np.stack((starts, ends), axis=-1).ravel()
+    sums = np.add.reduceat(data, bounds)[::2]
+    peaks = np.maximum.reduceat(data, bounds)[::2]
+
+    # sample indexes of every run, concatenated, and the run they belong to
+    lengths = ends - starts
+    run_ids = np.repeat(np.arange(starts.size), lengths)
+    first_position = np.cumsum(lengths) - lengths
+    ixs = np.arange(run_ids.size) - first_position[run_ids] + starts[run_ids]
+
+    # index of the first occurrence of the peak within each run
+    is_peak = data[ixs] == peaks[run_ids]
+    _, first_peak = np.unique(run_ids[is_peak], return_index=True)
+    accumulated[ixs[is_peak][first_peak]] = sums
+
+    return accumulated
+
+
+def odf_rms_derivative(audio, window=1024, hop=512, dtype=np.float64):
     """
     Onset detection function based on RMS.
 
@@ -78,6 +155,10 @@ def odf_rms_derivative(audio, window=1024, hop=512):
         Window length for computing the RMS.
     hop : int
         Hop length for computing the RMS.
+    dtype : numpy dtype
+        Data type for the calculation of the ODF. Single precision
+        (``np.float32``) halves the memory traffic, and is usually accurate
+        enough for picking the peaks.
 
     Return
     ------
@@ -85,7 +166,17 @@ def odf_rms_derivative(audio, window=1024, hop=512):
         Onset detection function.
     """
     rms = iracema.features.rms(audio, window, hop)
-    return rms.diff().hwr()  # * rms
+
+    # half-wave rectified first difference (equivalent to rms.diff().hwr()),
+    # computed in a single buffer, without intermediate time series copies
+    data = rms.data.astype(dtype, copy=False)
+    odf_data = np.empty_like(data)
+    odf_data[0] = data[0]
+    np.subtract(data[1:], data[:-1], out=odf_data[1:])
+    np.maximum(odf_data, 0, out=odf_data)
+
+    rms.data = odf_data
+    return rms
 
 
 def odf_pitch_change(audio,
@@ -93,7 +184,8 @@ def odf_pitch_change(audio,
                      hop=512,
                      minf0=120,
                      maxf0=4000,
-                     smooth_pitch=True):
+                     smooth_pitch=True,
+                     dtype=np.float64):
     """
     Onset detection function based on Pitch.
 
@@ -111,6 +203,10 @@ def odf_pitch_change(audio,
         Maximum frequency for the pitch detection.
     smooth_pitch: bool
         Whether or not the pitch curve should be smoothed.
+    dtype : numpy dtype
+        Data type for the calculation of the ODF. Single precision
+        (``np.float32``) halves the memory traffic, and is usually accurate
+        enough for picking the peaks.
 
     Return
     ------
@@ -124,14 +220,14 @@ def odf_pitch_change(audio,
         pitch = iracema.pitch.pitch_filter(pitch)
         pitch = iracema.pitch.pitch_mode(pitch, window=window_mode)
 
-    def ratio_successive(current, last):
-        min_denominator = 0.1
-        last = np.float(last) + min_denominator
-        ratio = current / last
-        if ratio >= 1:
-            ratio = ratio - 1
-        else:
-            ratio = 1 - ratio
-        return np.abs(ratio)
-
-    return aggregate_sucessive_samples(pitch, ratio_successive)
+    # ratio between successive samples of the pitch curve (zero is used as
+    # the sample preceding the first one), computed for the whole curve at once
+    min_denominator = 0.1
+    data = pitch.data.astype(dtype, copy=False)
+    previous = np.empty_like(data)
+    previous[0] = 0.
+    previous[1:] = data[:-1]
+    ratio = previous / (data + min_denominator)
+
+    return TimeSeries(
+        pitch.fs, data=np.abs(ratio - 1), start_time=pitch.start_time)
@@ -2,10 +2,13 @@
 Note onset detection methods.
 """
 import warnings 
+from functools import lru_cache, partial
+from multiprocessing import Pool
 from pathlib import Path
 
 import numpy as np
 import scipy.signal as sig
+from scipy.ndimage import median_filter
 from tensorflow.keras.models import load_model
 
 import iracema.features
@@ -46,6 +49,93 @@ def cnn_model(
     return_odf_data : bool
         Whether or not to return the odf data
 
+    """
+    audio_, sliced_spectrogram, frame_fs = _cnn_model_input(audio, instrument)
+
+    model = _load_onset_model(str(Path(__file__).parent/'clari-onsets.h5'))
+    y_pred = model.predict(sliced_spectrogram)
+
+    onsets, odf_data = _cnn_model_onsets(y_pred, frame_fs, smooth_odf,
+                                         odf_threshold)
+
+    if display_plot:
+        waveform_trio_features_and_points(audio_, odf_data, onsets)
+
+    if return_odf_data:
+        return onsets, odf_data
+    return onsets
+
+
+def cnn_model_batch(
+    audio_list,
+    instrument='clarinet',
+    smooth_odf=True,
+    odf_threshold = 0.328,
+    return_odf_data = False,
+):
+    """
+    Extract the note onsets for several audio files using the CNN method.
+    The slices of all the files are stacked and passed to the model in a
+    single call.
+
+    Arguments
+    ---------
+    audio_list: list
+        List of ir.Audio objects to be processed.
+    instrument: string
+        Name of the instrument (currently trained only for clarinet).
+    smooth_odf: bool
+        If true, the final ODF will be smoothed by convolving it with a hanning
+        window of length 5.
+    odf_threshold : float
+        Minimum threshold for the peak picking in the ODF curve.
+    return_odf_data : bool
+        Whether or not to return the odf data
+
+    Return
+    ------
+    results : list
+        List containing the onsets of each audio (or a tuple with the onsets
+        and the odf data, if `return_odf_data` is True), in the same order as
+        ``audio_list``.
+    """
+    inputs = [_cnn_model_input(audio, instrument) for audio in audio_list]
+    if not inputs:
+        return []
+
+    model = _load_onset_model(str(Path(__file__).parent/'clari-onsets.h5'))
+    y_pred_all = model.predict(
+        np.concatenate([sliced for _, sliced, _ in inputs]))
+
+    split_indexes = np.cumsum([len(sliced) for _, sliced, _ in inputs])[:-1]
+    results = []
+    for y_pred, (_, _, frame_fs) in zip(
+            np.split(y_pred_all, split_indexes), inputs):
+        onsets, odf_data = _cnn_model_onsets(y_pred, frame_fs, smooth_odf,
+                                             odf_threshold)
+        results.append((onsets, odf_data) if return_odf_data else onsets)
+
+    return results
+
+
+def clear_model_cache():
+    """
+    Release the models loaded by the CNN onset detection methods, which are
+    kept in memory to be reused across calls.
+    """
+    _load_onset_model.cache_clear()
+
+
+@lru_cache(maxsize=4)
+def _load_onset_model(model_file):
+    "Load the Keras model stored in ``model_file``."
+    return load_model(model_file)
+
+
+def _cnn_model_input(audio, instrument):
+    """
+    Generate the input tensor of the CNN model for ``audio``. Return the audio
+    resampled to 44.1 kHz, the tensor and its sampling frequency.
     """
     audio_ = audio.copy()
     if float(audio_.fs) != 44100.:
@@ -69,10 +159,14 @@ def cnn_model(
         db = True,
     )
 
-    here = Path(__file__).parent
-    model_file = here/'clari-onsets.h5'
-    model = load_model(model_file)
-    y_pred = model.predict(sliced_spectrogram)
+    return audio_, sliced_spectrogram, frame_fs
+
+
+def _cnn_model_onsets(y_pred, frame_fs, smooth_odf, odf_threshold):
+    """
+    Extract the onsets from the predictions ``y_pred`` of the CNN model.
+    Return the onsets and the odf data.
+    """
     if smooth_odf:
         y_pred[:, 0] = convolve_activations(y_pred[:, 0])
 
@@ -85,12 +179,7 @@ def cnn_model(
     )
     odf_data = y_pred[:, 0]
 
-    if display_plot:
-        waveform_trio_features_and_points(audio_, odf_data, onsets)
-
-    if return_odf_data:
-        return onsets, odf_data
-    return onsets
+    return onsets, odf_data
 
 
 def adaptative_rms(
@@ -104,6 +193,7 @@ def adaptative_rms(
         display_plot=False,
         display_plot_rms=False,
         return_odf_data=False,
+        dtype=np.float64,
 ):
     """
     Extract the note onsets using the adaptative RMS method.
@@ -131,6 +221,9 @@ def adaptative_rms(
         Whether of not to plot the results.
     return_odf_data : bool
         Whether or not to return the odf data.
+    dtype : numpy dtype
+        Data type for the calculation of the ODF (see
+        ``odf_adaptative_rms``).
 
     Return
     ------
@@ -153,6 +246,7 @@ def adaptative_rms(
         odf_threshold=odf_threshold,
         odf_threshold_criteria="relative_to_max",
         display_plot=display_plot,
+        dtype=dtype,
     )
 
     if return_odf_data:
@@ -168,6 +262,7 @@ def rms_derivative(
         odf_threshold=0.2,
         display_plot=False,
         return_odf_data=False,
+        dtype=np.float64,
 ):
     """
     Extract note onsets from the ``audio`` time-series using its ``rms``.
@@ -191,6 +286,9 @@ def rms_derivative(
         Whether of not to plot the results
     return_odf_data : bool
         Whether or not to return the odf data
+    dtype : numpy dtype
+        Data type for the calculation of the ODF (see
+        ``odf_rms_derivative``).
 
     Return
     ------
@@ -209,6 +307,7 @@ def rms_derivative(
         min_time=min_time,
         odf_threshold=odf_threshold,
         display_plot=display_plot,
+        dtype=dtype,
     )
 
     if return_odf_data:
@@ -227,6 +326,7 @@ def pitch_variation(
         odf_threshold=0.04,
         display_plot=False,
         return_odf_data=False,
+        dtype=np.float64,
 ):
     """
     Extract note onsets from the ``audio`` time-series using its ``pitch``.
@@ -255,6 +355,9 @@ def pitch_variation(
         Whether of not to plot the results
     return_odf_data : bool
         Whether or not to return the odf data
+    dtype : numpy dtype
+        Data type for the calculation of the ODF (see
+        ``odf_pitch_change``).
 
     Return
     ------
@@ -278,6 +381,7 @@ def pitch_variation(
         maxf0=maxf0,
         smooth_pitch=smooth_pitch,
         display_plot=display_plot,
+        dtype=dtype,
     )
 
     if return_odf_data:
@@ -291,6 +395,9 @@ def extract_from_odf(
         min_time=None,
         odf_threshold=0.2,
         odf_threshold_criteria="absolute",
+        median_window=15,
+        min_prominence=None,
+        prominence_time=None,
         display_plot=False,
         **parameters,
 ):
@@ -307,13 +414,25 @@ def extract_from_odf(
         Minimum time (in seconds) between successive onsets.
     odf_threshold : float
         Minimum ODF threshold for a peak to be considered as an onset.
-    odf_threshold_criteria : string ['absolute', 'relative_to_max']
+    odf_threshold_criteria : string ['absolute', 'relative_to_max', 'median']
         Specifies how the argument ``odf_threshold`` will be used: if
         ``'absolute'`` its value will be used directly as the threshold;
         else, if ``'relative_to_max'``, its value will be used to calculate
         the threshold, relative to the maximum value in the ODF curve, e.g.:
         ``odf_threshold``==``0.2`` set the threshold to 20% of the maximum
-        value of the ODF curve.
+        value of the ODF curve; else, if ``'median'``, an adaptive threshold
+        will be used, with its value added to the moving median of the ODF
+        curve.
+    median_window : int
+        Length (in samples of the ODF) of the window used to calculate the
+        moving median, if ``odf_threshold_criteria`` is ``'median'``.
+    min_prominence : float, optional
+        Minimum prominence of a peak in the ODF curve (i.e. its height
+        relative to the surrounding valleys) to be considered as an onset.
+    prominence_time : float, optional
+        Length (in seconds) of the window used to search for the valleys
+        when calculating the prominence of the peaks. If None, the whole
+        ODF curve will be used.
     display_plot : bool
         Whether or not to plot the results.
 
@@ -322,35 +441,92 @@ def extract_from_odf(
     onsets: PointList
         List of onsets.
     odf_data: TimeSeries
-        Time series containing the onset detection function obtained.
+        Time series containing the onset detection function obtained, i.e.
+        the value returned by ``odf``. It is always returned, so the result
+        is a tuple ``(onsets, odf_data)``.
     """
     odf_data = odf(audio, **parameters)
 
-    if min_time:
-        min_dist = int(min_time * odf_data.fs)
-        if min_dist == 0:
-            min_dist = None
-    else:
-        min_dist = None
+    min_dist = _min_dist(min_time, odf_data.fs)
 
     if odf_threshold_criteria == "absolute":
         threshold = odf_threshold
     elif odf_threshold_criteria == "relative_to_max":
         threshold = odf_threshold * np.max(odf_data.data)
+    elif odf_threshold_criteria == "median":
+        threshold = odf_threshold + median_filter(
+            odf_data.data, size=median_window, mode='nearest')
     else:
         raise ValueError(
             ("Invalid value for argument `odf_threshold_criteria`: "
              f"'{odf_threshold_criteria}'"))
 
+    if min_prominence is not None and prominence_time:
+        wlen = int(prominence_time * float(odf_data.fs))
+    else:
+        wlen = None
+
     ixs_onsets, _ = sig.find_peaks(
-        odf_data.data, height=threshold, distance=min_dist)
+        odf_data.data,
+        height=threshold,
+        distance=min_dist,
+        prominence=min_prominence,
+        wlen=wlen)
 
-    onsets = iracema.core.point.PointList([
-        iracema.core.point.Point.from_sample_index(ix, odf_data)
-        for ix in ixs_onsets
-    ])
+    onsets = iracema.core.point.PointList.from_list_of_indexes(
+        ixs_onsets, odf_data)
 
     if display_plot:
         waveform_trio_features_and_points(audio, odf_data, onsets)
 
-    return onsets, odf
+    return onsets, odf_data
+
+
+def _min_dist(min_time, fs):
+    """
+    Convert the minimum time (in seconds) between successive onsets to the
+    minimum distance in samples for the peak picking. Return None if there
+    is no minimum distance.
+    """
+    if not min_time:
+        return None
+    return int(min_time * float(fs)) or None
+
+
+def extract_batch(audio_list, method, n_workers=None, **parameters):
+    """
+    Extract the note onsets for several audio time series, using a pool of
+    worker processes.
+
+    Arguments
+    ---------
+    audio_list : list
+        List of Audio objects.
+    method : function
+        Onset extraction method to be applied to each audio (e.g.
+        ``adaptative_rms``). It must be defined at the top level of a module,
+        so it can be sent to the worker processes.
+    n_workers : int
+        Number of worker processes. If None, the number of CPUs will be used.
+    **parameters
+        Keyword arguments passed to ``method``.
+
+    Return
+    ------
+    results : list
+        List containing the return values of ``method`` for each audio, in
+        the same order as ``audio_list``.
+
+    Note
+    ----
+    The CNN method is not run in worker processes (TensorFlow does not work
+    well with forked processes, and each worker would load its own copy of
+    the model); if ``method`` is ``cnn_model``, ``cnn_model_batch`` will be
+    used instead, which runs the model once for all the audio files.
+    """
+    if method is cnn_model:
+        parameters.pop('display_plot', None)
+        return cnn_model_batch(audio_list, **parameters)
+
+    with Pool(n_workers) as pool:
+        return pool.map(partial(method, **parameters), audio_list)
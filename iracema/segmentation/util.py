@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import numpy as np
 from numpy.lib.stride_tricks import as_strided
 from scipy.signal.windows import get_window
@@ -6,19 +8,32 @@ from scipy.signal import convolve
 import iracema as ir
 
 
-def convolve_activations(activations, n_frames=5, window_function='hanning'):
-    w = get_window(window_function, n_frames, fftbins=False)
-    convolved_activations = convolve(activations, w, mode='same')
-    convolved_activations = convolved_activations / np.max(convolved_activations)
+def convolve_activations(activations, n_frames=5, window_function='hann'):
+    w = _get_window(window_function, n_frames)
+    if activations.size >= n_frames:
+        # direct convolution is faster than scipy's method selection for
+        # such short windows
+        convolved_activations = np.convolve(activations, w, mode='same')
+    else:
+        convolved_activations = convolve(activations, w, mode='same')
+    convolved_activations /= np.max(convolved_activations)
     return convolved_activations
 
 
+@lru_cache(maxsize=8)
+def _get_window(window_function, n_frames):
+    w = get_window(window_function, n_frames, fftbins=False)
+    w.flags.writeable = False
+    return w
+
+
 def three_sliced_mel_spectrograms(audio,
                                   window,
                                   hop,
                                   medium_window_factor=2,
                                   long_window_factor=4,
                                   frames_per_slice=15,
+                                  dtype=np.float64,
                                   **kwargs):
     """
     Convert audio into a tensor containing three mel spectrograms. 
@@ -26,6 +41,12 @@ def three_sliced_mel_spectrograms(audio,
     The tensor contains slices of the spectrograms. Each mel
     spectrogram correspond to one channel.
 
+    The spectrograms are computed with data type ``dtype`` and the tensor is
+    built in a contiguous array of the same type. Double precision is used by
+    default; single precision (``np.float32``, the type used by the Keras
+    models) can be chosen to halve the memory of the tensor and to pass it to
+    the model without being copied again.
+
     Return
     ------
     data : np.array
@@ -37,44 +58,39 @@ def three_sliced_mel_spectrograms(audio,
     medium_window = window * medium_window_factor
     long_window = window * long_window_factor
 
-    mel_spec_long = (ir.spectral.MelSpectrogram(audio, long_window, hop,
-                                                **kwargs))
-    mel_spec_medium = (ir.spectral.MelSpectrogram(audio, medium_window, hop,
-                                                  **kwargs))
-    mel_spec_short = (ir.spectral.MelSpectrogram(audio, window, hop,
-                                                 **kwargs))
+    (mel_short, mel_medium, mel_long), fs = (
+        ir.spectral.multi_window_mel_data(
+            audio, (window, medium_window, long_window), hop, dtype=dtype,
+            **kwargs))
 
     pad_len = np.floor_divide(frames_per_slice, 2)
 
-    short_len = mel_spec_short.data.shape[1]
-    medium_len = mel_spec_medium.data.shape[1]
-    long_len = mel_spec_long.data.shape[1]
-
-    dif_long_short = long_len - short_len
-    dif_long_medium = long_len - medium_len
-
-    # padding the extremes of the spectrogram
-    mel_spec_short = mel_spec_short.pad(pad_len,
-                                        pad_len + dif_long_short,
-                                        value='repeat')
-    mel_spec_medium = mel_spec_medium.pad(pad_len,
-                                          pad_len + dif_long_medium,
-                                          value='repeat')
-    mel_spec_long = mel_spec_long.pad(pad_len, pad_len, value='repeat')
-
-    data = np.stack(
-        [mel_spec_short.data, mel_spec_medium.data, mel_spec_long.data])
-
-    # generating a sliced view of the spectrogram
-    nchannels, nfrequencies, ntime = data.shape
-    nslices = ntime - 2 * pad_len
-    new_shape = (nchannels, nfrequencies, frames_per_slice, nslices)
-    strides = (nfrequencies * ntime * data.itemsize, ntime * data.itemsize,
-               data.itemsize, data.itemsize)
-    data = as_strided(data, shape=new_shape, strides=strides)
-
-    data = data.T
-    fs = float(mel_spec_short.fs)
+    long_len = mel_long.shape[1]
+    nfrequencies = mel_long.shape[0]
+    # one slice for each frame of the spectrograms (for an even
+    # ``frames_per_slice``, the last frame of each slice is the extra one)
+    nslices = long_len
+
+    # the slices of each spectrogram are written directly into its channel of
+    # the output tensor, with the axes in the order expected by the model:
+    # (slices, frames, frequencies, channels)
+    data = np.empty((nslices, frames_per_slice, nfrequencies, 3), dtype=dtype)
+    for channel, mel_spec in enumerate((mel_short, mel_medium, mel_long)):
+        # padding the extremes of the spectrogram (repeating the values at
+        # the edges), so that all of them have the same length
+        mel_spec = np.pad(
+            mel_spec, ((0, 0), (pad_len, pad_len + long_len -
+                                mel_spec.shape[1])), mode='edge')
+        # view of the slices, with shape (slices, frames, frequencies)
+        freq_stride, time_stride = mel_spec.strides
+        slices = as_strided(
+            mel_spec,
+            shape=(nslices, frames_per_slice, nfrequencies),
+            strides=(time_stride, time_stride, freq_stride),
+            writeable=False)
+        np.copyto(data[..., channel], slices, casting='unsafe')
+
+    fs = float(fs)
 
     return data, fs
 
@@ -101,5 +117,10 @@ def get_notes_list(onsets, offsets):
     if onsets.shape != offsets.shape:
         raise ValueError("the number of onsets and offsets must the same")
 
-    return [ir.Segment(onsets[i], offsets[i]) for i in range(len(onsets))]
+    # the arrays are converted to Python scalars in a single call, instead of
+    # indexing them (and creating a NumPy scalar) for every segment
+    return [
+        ir.Segment(onset, offset)
+        for onset, offset in zip(onsets.tolist(), offsets.tolist())
+    ]
 
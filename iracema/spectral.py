@@ -2,14 +2,19 @@
 Extraction of spectral information.
 """
 from decimal import Decimal
+from functools import lru_cache
 
 import numpy as np
+import scipy.fft
+from scipy.sparse import csr_matrix
 from deprecated.sphinx import deprecated
 from librosa.filters import mel
 from librosa.core.convert import mel_frequencies
 from librosa import cqt, hybrid_cqt, cqt_frequencies
 
-from iracema.util.windowing import apply_sliding_window
+from iracema.util.windowing import (calculate_sliding_window_parms,
+                                    get_sliding_window_view,
+                                    get_window_function)
 from iracema.util import conversion
 import iracema.core.timeseries
 
@@ -17,7 +22,12 @@ import iracema.core.timeseries
 class STFT(iracema.core.timeseries.TimeSeries):
     "Compute the Short-Time Fourier Transform for the ``time_series``."
 
-    def __init__(self, time_series, window_size, hop_size, fft_len=None):
+    def __init__(self,
+                 time_series,
+                 window_size,
+                 hop_size,
+                 fft_len=None,
+                 dtype=None):
         """
         Args
         ----
@@ -28,19 +38,21 @@ class STFT(iracema.core.timeseries.TimeSeries):
         fft_len : int
             Length of the FFT. The signal will be zero-padded if ``fft_len`` >
             ``window_size``. The default value is equal to `window_size`.
+        dtype : numpy dtype, optional
+            Data type the time series will be converted to before computing
+            the STFT. Using ``np.float32`` results in a single precision
+            (``complex64``) STFT, which halves the memory traffic. By default,
+            the data type of the time series is used.
         """
         if not fft_len:
             fft_len = window_size
 
-        def calculate(x):
-            return np.fft.rfft(x, n=fft_len, norm='ortho')
+        data = time_series.data
+        if dtype is not None:
+            data = data.astype(dtype, copy=False)
 
-        stft_data = apply_sliding_window(
-            time_series.data,
-            window_size,
-            hop_size,
-            calculate,
-            window_name='hann')
+        frames = get_sliding_window_view(data, window_size, hop_size)
+        stft_data = _windowed_rfft(frames, fft_len).T
 
         new_fs = Decimal(time_series.fs) / Decimal(hop_size)
 
@@ -60,7 +72,7 @@ class STFT(iracema.core.timeseries.TimeSeries):
         if float(power) not in (1., 2.):
             raise ValueError(
                 'The argument `power` must be equal to 1.0 or 2.0')
-        magnitude = np.abs(self.data)**power
+        magnitude = _magnitude(self.data, power)
         if db:
             if power == 1.0:
                 magnitude = conversion.amplitude_to_db(magnitude)
@@ -81,7 +93,8 @@ class Spectrogram(iracema.core.timeseries.TimeSeries):
                  hop_size,
                  fft_len=None,
                  power=2.,
-                 db=False):
+                 db=False,
+                 dtype=None):
         """
         Args
         ----
@@ -96,8 +109,11 @@ class Spectrogram(iracema.core.timeseries.TimeSeries):
             Exponent for the spectrogram.
         db : bool
             Whether or not to convert the output values to dB.
+        dtype : numpy dtype, optional
+            Data type for the computation of the STFT (see ``STFT``).
         """
-        stft = STFT(time_series, window_size, hop_size, fft_len=fft_len)
+        stft = STFT(time_series, window_size, hop_size, fft_len=fft_len,
+                    dtype=dtype)
         data = stft.magnitude(power=power, db=db)
 
         super(Spectrogram, self).__init__(
@@ -126,7 +142,8 @@ class MelSpectrogram(iracema.core.timeseries.TimeSeries):
                  db=False,
                  fmin=0.,
                  fmax=None,
-                 htk=False):
+                 htk=False,
+                 dtype=None):
         """
         Compute a mel spectrogram for ``time_series``.
 
@@ -150,22 +167,20 @@ class MelSpectrogram(iracema.core.timeseries.TimeSeries):
         fmax : float
             Frequency of the highest filter.
         htk : bool
+        dtype : numpy dtype, optional
+            Data type for the computation of the STFT (see ``STFT``).
         """
         if not fft_len:
             fft_len = window_size
 
-        spec = Spectrogram(
-            time_series,
-            window_size,
-            hop_size,
-            fft_len=fft_len,
-            power=power,
-            db=False)
+        # the magnitude of the STFT is projected onto the mel filters right
+        # away, without building an intermediate Spectrogram object
+        stft = STFT(time_series, window_size, hop_size, fft_len=fft_len,
+                    dtype=dtype)
 
-        fmax = fmax or spec.max_frequency
-        mel_basis = mel(
-            time_series.fs, fft_len, n_mels=n_mels, fmin=fmin, fmax=fmax)
-        data = np.dot(mel_basis, spec.data)
+        fmax = fmax or stft.max_frequency
+        mel_basis = _mel_basis(time_series.fs, fft_len, n_mels, fmin, fmax)
+        data = mel_basis @ stft.magnitude(power=power)
 
         if db:
             if power == 1.0:
@@ -174,14 +189,14 @@ class MelSpectrogram(iracema.core.timeseries.TimeSeries):
                 data = conversion.energy_to_db(data)
 
         super(MelSpectrogram, self).__init__(
-            spec.fs,
+            stft.fs,
             data=data,
-            start_time=spec.start_time,
-            caption=spec.caption)
+            start_time=stft.start_time,
+            caption=stft.caption)
 
         self.frequencies = mel_frequencies(
             n_mels=n_mels, fmin=fmin, fmax=fmax, htk=htk)
-        self.max_frequency = spec.frequencies[-1]
+        self.max_frequency = stft.frequencies[-1]
         self.label = 'Mel Spectrogram'
         self.unit = 'Magnitude'
         self._power = power
@@ -262,6 +277,136 @@ class CQT(iracema.core.timeseries.TimeSeries):
         self._db = db
 
 
+def _windowed_rfft(frames, fft_len=None):
+    """
+    Apply a Hann window to each frame (last axis of ``frames``) and calculate
+    their FFT at once, using the worker threads of ``scipy.fft``. Floating
+    point frames keep their precision, i.e., single precision frames result
+    in a ``complex64`` array.
+    """
+    if np.issubdtype(frames.dtype, np.floating):
+        window = get_window_function(frames.shape[-1], 'hann',
+                                     dtype=frames.dtype)
+    else:
+        window = get_window_function(frames.shape[-1], 'hann')
+    return scipy.fft.rfft(
+        frames * window, n=fft_len, axis=-1, norm='ortho', workers=-1)
+
+
+def _magnitude(stft_data, power):
+    """
+    Calculate the magnitude of the complex array ``stft_data`` raised to
+    ``power``. The squared magnitude is calculated directly from the real
+    and imaginary parts, so no square root is needed when ``power`` is 2.
+    """
+    if power == 1.:
+        return np.abs(stft_data)
+    squared_magnitude = np.square(stft_data.real)
+    squared_magnitude += np.square(stft_data.imag)
+    if power == 2.:
+        return squared_magnitude
+    return squared_magnitude**(power / 2.)
+
+
+def multi_window_mel_data(time_series,
+                          window_sizes,
+                          hop_size,
+                          n_mels=256,
+                          fft_len=None,
+                          power=2.,
+                          db=False,
+                          fmin=0.,
+                          fmax=None,
+                          htk=False,  # pylint: disable=unused-argument
+                          dtype=None):
+    """
+    Compute the data of several mel spectrograms for ``time_series``, one for
+    each window size in ``window_sizes``, all of them with the same
+    ``hop_size``. The result is the same as computing a ``MelSpectrogram``
+    for each window size, but the signal is framed only once: the frames for
+    each window size are views of the central part of the frames of the
+    largest window, since all of them are centered at the same instants.
+
+    Args
+    ----
+    time_series : TimeSeries
+        Time series for computing the mel spectrograms.
+    window_sizes : sequence of int
+    hop_size : int
+    n_mels : int
+        Number of mel-scaled filters/channels.
+    fft_len : int
+        Length of the FFT, used for all the window sizes. The signal will be
+        zero-padded if ``fft_len`` > ``window_size``. By default, the length
+        of each window is used.
+    power : float
+        Exponent for the spectrograms.
+    db : bool
+        Whether or not to convert the output values to dB.
+    fmin : float
+        Frequency of the lowest filter.
+    fmax : float
+        Frequency of the highest filter.
+    htk : bool
+        Accepted for compatibility with ``MelSpectrogram``, in which it only
+        changes the ``frequencies`` attribute (so it has no effect on the
+        data returned here).
+    dtype : numpy dtype, optional
+        Data type for the computation of the STFT (see ``STFT``).
+
+    Return
+    ------
+    data_list : list
+        List with the data array of each mel spectrogram.
+    fs : Decimal
+        Sampling frequency of the mel spectrograms.
+    """
+    data = time_series.data
+    if dtype is not None:
+        data = data.astype(dtype, copy=False)
+
+    largest_window = max(window_sizes)
+    largest_frames = get_sliding_window_view(data, largest_window, hop_size)
+    fmax = fmax or float(time_series.nyquist)
+
+    data_list = []
+    for window_size in window_sizes:
+        _, _, num_hops = calculate_sliding_window_parms(
+            window_size, hop_size, time_series.nsamples)
+        start = largest_window // 2 - window_size // 2
+        frames = largest_frames[:num_hops, start:start + window_size]
+
+        window_fft_len = fft_len or window_size
+        spec_data = _magnitude(_windowed_rfft(frames, window_fft_len).T,
+                               power)
+
+        mel_basis = _mel_basis(time_series.fs, window_fft_len, n_mels, fmin,
+                               fmax)
+        data = mel_basis @ spec_data
+        if db:
+            if power == 1.0:
+                data = conversion.amplitude_to_db(data)
+            elif power == 2.0:
+                data = conversion.energy_to_db(data)
+        data_list.append(data)
+
+    fs = Decimal(time_series.fs) / Decimal(hop_size)
+
+    return data_list, fs
+
+
+@lru_cache(maxsize=16)
+def _mel_basis(fs, fft_len, n_mels, fmin, fmax):
+    """
+    Return the mel filter bank for the given parameters, as a sparse matrix
+    (each frequency bin belongs to at most two triangular filters, so most of
+    its elements are zero). The filter banks are cached, since the same
+    parameters are usually used for several audio files (e.g.: in the CNN
+    onset detection method), so the returned matrix must not be modified.
+    """
+    return csr_matrix(mel(fs, fft_len, n_mels=n_mels, fmin=fmin, fmax=fmax))
+
+
 @deprecated(version='0.2.0', reason='Deprecated method. Use `STFT` instead.')
 def fft(*args, **kwargs):
     "Deprecated FFT method."
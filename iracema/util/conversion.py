@@ -12,13 +12,24 @@ def sample_index_to_seconds(sample_index, fs, time_offset=0):
 
     Args
     ----
-    sample_index: int
-        The index of a sample in a time series.
+    sample_index: int or numpy array
+        The index of a sample in a time series. If an array is given, all of
+        its elements will be converted at once and an array of floats will be
+        returned.
     fs: float
         Sampling frequency.
     time_offset: float
         Time offset to be added to the result (in seconds).
+
+    Note
+    ----
+    For scalar indexes the result is a Decimal, so that it can be added to the
+    (Decimal) start time of a time series without loss of precision.
     """
+    if isinstance(sample_index, np.ndarray):
+        seconds = np.divide(sample_index, float(fs), dtype=np.float64)
+        seconds += float(time_offset)
+        return seconds
     sample_index = Decimal(sample_index)
     fs = Decimal(fs)
     time_offset = Decimal(time_offset)
@@ -31,8 +42,9 @@ def seconds_to_sample_index(time, fs, time_offset=0):
 
     Args
     ----
-    time: float
-        Time in seconds.
+    time: float or numpy array
+        Time in seconds. If an array is given, all of its elements will be
+        converted at once and an array of integers will be returned.
     fs: float
         Sampling frequency.
     time_offset: float
@@ -44,6 +56,9 @@ def seconds_to_sample_index(time, fs, time_offset=0):
     be careful when doing these conversion operation between sample index and
     time, not to incur in loss of precision.
     """
+    if isinstance(time, np.ndarray):
+        # truncate towards zero, just like int() does for scalars
+        return ((time - float(time_offset)) * float(fs)).astype(np.int64)
     return int((time - time_offset) * fs)
 
 
@@ -56,7 +71,7 @@ def map_sample_index(sample_index, source_fs, source_time_offset, target_fs,
 
     Args
     ----
-    sample_index : int
+    sample_index : int or numpy array
     source_fs : float
     source_time_offset : float
     target_fs : float
@@ -64,8 +79,18 @@ def map_sample_index(sample_index, source_fs, source_time_offset, target_fs,
 
     Return
     ------
-    target_sample_index : int
+    target_sample_index : int or numpy array
     """
+    if isinstance(sample_index, np.ndarray):
+        # a single scale and shift for the whole array, truncated towards zero
+        # just like the scalar conversion
+        ratio = float(target_fs) / float(source_fs)
+        bias = (float(source_time_offset) -
+                float(target_time_offset)) * float(target_fs)
+        target_sample_index = sample_index * ratio
+        target_sample_index += bias
+        return target_sample_index.astype(np.int64)
+
     seconds = sample_index_to_seconds(
         sample_index, source_fs, time_offset=source_time_offset)
 
@@ -77,25 +102,42 @@ def amplitude_to_db(amplitude, clip_min=1.e-10):
     """
     Convert amplitude to dB.
     """
-    return energy_to_db(amplitude**2, clip_min=clip_min)
+    return energy_to_db(np.square(amplitude), clip_min=clip_min)
 
 
 def energy_to_db(energy, clip_min=1.e-20):
     """
     Convert energy to dB.
     """
-    return 10 * np.log10(np.clip(energy, clip_min, None))
+    db = np.maximum(energy, clip_min)
+    if not isinstance(db, np.ndarray):
+        return 10 * np.log10(db)
+    # the clipped array is converted in place
+    np.log10(db, out=db)
+    db *= 10
+    return db
 
 
 def db_to_amplitude(db):
     """
     Convert dB to amplitude.
     """
-    return 10 ** (db / 20)
+    return _db_to_linear(db, 20.)
 
 
 def db_to_energy(db):
     """
     Convert dB to energy.
     """
-    return 10 ** (db / 10)
+    return _db_to_linear(db, 10.)
+
+
+def _db_to_linear(db, factor):
+    """
+    Compute ``10 ** (db / factor)``, in a single array for array inputs.
+    """
+    if not isinstance(db, np.ndarray):
+        return 10 ** (db / factor)
+    linear = np.divide(db, factor)
+    np.power(10., linear, out=linear)
+    return linear
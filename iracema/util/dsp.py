@@ -1,6 +1,8 @@
 """
 Functions that are commonly used in digital signal processing.
 """
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 
 import numpy as np
 from scipy import signal
@@ -25,7 +27,11 @@ def local_peaks(array):
     # calculate the first derivative
     arr_diff = np.diff(array)
     # search for indexes where the slope changes from positive to negative
-    ix = np.nonzero((arr_diff[1:] < 0) & (arr_diff[:-1] >= 0))[0] + 1
+    # (the masks are combined in place, to avoid another temporary array)
+    is_peak = arr_diff[:-1] >= 0
+    is_peak &= arr_diff[1:] < 0
+    ix = np.flatnonzero(is_peak)
+    ix += 1
     values = array[ix]
 
     return values, ix
@@ -42,10 +48,14 @@ def n_highest_peaks(array, n):
     n : int
         Number of peaks to search.
     """
-    # sort the array by its peaks and choose the n highest values
+    # choose the n highest peaks, in ascending order of value
     val, ix = local_peaks(array)
-    ix_n = np.argsort(val)[-n:]
-    # TODO: to figure out a more efficient way to to this
+    if 0 < n < val.size:
+        # partial selection is O(N), only the n selected peaks get sorted
+        ix_n = np.argpartition(val, -n)[-n:]
+        ix_n = ix_n[np.argsort(val[ix_n])]
+    else:
+        ix_n = np.argsort(val)[-n:]
 
     return val[ix_n], ix[ix_n]
 
@@ -65,20 +75,21 @@ def decimate_mean(array, f):
     if array.ndim > 1:
         raise ValueError("array must be unidimensional")
 
-    # pad the array with zeros at the end before reshaping
-    pad = np.zeros((f - array.size % f,), dtype=array.dtype)
-    padded_array = np.concatenate((array, pad))
-    new_shape = (f, int(padded_array.size/f))
-    reshaped_array = np.reshape(padded_array, new_shape)
-    decimated_array = np.mean(reshaped_array, axis=0)
+    # sum each group of f samples in a single pass; dividing the sum of the
+    # (incomplete) last group by f is the same as padding it with zeros
+    starts = np.arange(0, array.size, f)
+    decimated_array = np.add.reduceat(array, starts) / f
 
     return decimated_array
 
 
-def but_filter(audio_data, fs, critical_frequency, filter_type='lowpass', filter_order=4):
+def but_filter(audio_data, fs, critical_frequency, filter_type='lowpass',
+               filter_order=4, zero_phase=False, n_workers=1):
     """
     Filters the input data using a butterworth digital filter. This is a wrapper
-    over ``scipy.signal.butter``.
+    over ``scipy.signal.butter``. The filter coefficients are cached, so
+    filtering several time series with the same parameters designs the filter
+    only once.
 
     Arguments
     ---------
@@ -86,15 +97,44 @@ def but_filter(audio_data, fs, critical_frequency, filter_type='lowpass', filter
         Numpy array containing the data of a time series.
     fs: float
         Sampling frequency.
-    critical_frequency: float
+    critical_frequency: float or sequence of two floats
         The critical frequency of frequencies.
     filter_type: [‘lowpass’, ‘highpass’, ‘bandpass’, ‘bandstop’]
-        The type of filter. filter_order: The order of the filter.
+        The type of filter.
+    filter_order: int
+        The order of the filter.
+    zero_phase: bool
+        Whether the data should be filtered forward and backward (using
+        ``scipy.signal.sosfiltfilt``), which results in zero phase distortion.
+    n_workers: int
+        Number of threads used to filter the channels of multi-channel data
+        (2-D arrays) concurrently. If None, the number of CPUs will be used.
+    """
+    if np.ndim(critical_frequency):
+        critical_frequency = tuple(np.ravel(critical_frequency).tolist())
+    sos = _butter_sos(filter_order, critical_frequency, filter_type, float(fs))
+    sosfilt = signal.sosfiltfilt if zero_phase else signal.sosfilt
+
+    if n_workers == 1 or np.ndim(audio_data) != 2 or len(audio_data) < 2:
+        return sosfilt(sos, audio_data)
+
+    # scipy releases the GIL while filtering, so the channels can be filtered
+    # by different threads
+    with ThreadPoolExecutor(n_workers) as executor:
+        channels = list(executor.map(partial(sosfilt, sos), audio_data))
+    return np.stack(channels)
+
+
+@lru_cache(maxsize=128)
+def _butter_sos(filter_order, critical_frequency, filter_type, fs):
+    """
+    Design a butterworth filter in second-order sections. The returned array
+    is shared by every call with the same parameters, so it must not be
+    modified.
     """
     sos = signal.butter(filter_order,
                         critical_frequency,
                         filter_type,
                         fs=fs,
                         output='sos')
-    filtered = signal.sosfilt(sos, audio_data)
-    return filtered
+    return sos
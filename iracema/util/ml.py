@@ -1,5 +1,6 @@
 "Useful methods for ML models."
 import warnings
+from functools import lru_cache
 
 import numpy as np
 import scipy.signal
@@ -13,7 +14,8 @@ def points_to_activations(point_list,
                           encoding='binary',
                           warn_lost_onset=True,
                           activation_type='single',
-                          triang_value=0.4):
+                          triang_value=0.4,
+                          dtype=np.float64):
     """
     Convert a point list to an array with the corresponding activations.
 
@@ -41,6 +43,16 @@ def points_to_activations(point_list,
            given time instants;
         - 'triangular' will yield a triangular activation around the point
            corresponding to each time instant.
+    dtype : numpy dtype
+        Data type of the activations array (see
+        ``time_array_to_activations``).
+
+    Returns
+    -------
+    activations : np.array
+        C-contiguous array with shape ``(output_length, 1)`` for 'binary'
+        encoding or ``(output_length, 2)`` for 'onehot' encoding, which can be
+        converted to a tensor without copying the data.
     """
     _validate_encoding(encoding)
 
@@ -50,7 +62,8 @@ def points_to_activations(point_list,
                                             output_length,
                                             warn_lost_onset=warn_lost_onset,
                                             activation_type=activation_type,
-                                            triang_value=triang_value)
+                                            triang_value=triang_value,
+                                            dtype=dtype)
     if encoding == 'onehot':
         activations = binary_to_onehot_activations(activations)
     elif encoding == 'binary':
@@ -94,7 +107,8 @@ def time_array_to_activations(time_array,
                               output_length,
                               warn_lost_onset=True,
                               activation_type='single',
-                              triang_value=0.4):
+                              triang_value=0.4,
+                              dtype=np.float64):
     """
     Convert an array of times to an array of activations.
 
@@ -118,26 +132,57 @@ def time_array_to_activations(time_array,
            corresponding to each time instant.
         - 'gaussian' will yield a gaussian activation around the point
            corresponding to each time instant.
+    dtype : numpy dtype
+        Data type of the activations array. Single precision (``np.float32``)
+        halves the memory used by the activations; an integer type (e.g.
+        ``np.int8``) can be used with the activation type 'single'.
     """
     _validate_activation_type(activation_type)
+    if (activation_type != 'single' and
+            not np.issubdtype(dtype, np.floating)):
+        raise ValueError('The activation types `triangular` and `gaussian` '
+                         'require a floating point `dtype`.')
+
+    # the times are converted to float, scaled and rounded in a single array
+    # (single precision times are not promoted, since that would not make them
+    # more precise)
+    if getattr(time_array, 'dtype', None) == np.float32:
+        float_type = np.float32
+    else:
+        float_type = np.float64
+    time_indexes = np.multiply(time_array, float(output_fs), dtype=float_type,
+                               casting='unsafe')
+    np.rint(time_indexes, out=time_indexes)
+    time_indexes = time_indexes.astype(np.int64)
+
+    # onsets outside of the output array are discarded (negative indexes would
+    # otherwise be written at the end of the array)
+    in_range = (time_indexes >= 0) & (time_indexes < output_length)
+    num_onsets_out_of_range = time_indexes.size - np.count_nonzero(in_range)
+    if num_onsets_out_of_range:
+        time_indexes = time_indexes[in_range]
+        if warn_lost_onset:
+            warnings.warn(
+                f"Lost {num_onsets_out_of_range} onsets during conversion "
+                "from point list to probability array, since they are "
+                "outside of the time span of the output array.")
 
-    time_indexes = np.round(time_array.astype(float) *
-                            float(output_fs)).astype(int)
-    activations = np.zeros(output_length)
+    activations = np.zeros(output_length, dtype=dtype)
 
     if activation_type == 'triangular':
-        time_indexes_last = np.clip(time_indexes - 1, 0, None)
-        time_indexes_next = np.clip(time_indexes + 1, None, output_length - 1)
-        neighbours = np.append(time_indexes_last, time_indexes_next)
-        neighbours = np.unique(neighbours)
-        activations[neighbours] = triang_value
+        # repeated indexes are harmless, since the same value is assigned
+        activations[np.clip(time_indexes - 1, 0, None)] = triang_value
+        activations[np.clip(time_indexes + 1, None,
+                            output_length - 1)] = triang_value
     elif activation_type == 'gaussian':
+        activations[time_indexes] = 1.
         activations = _activations_to_gaussian(activations)
 
     activations[time_indexes] = 1.
 
-    num_onsets_original = len(time_array)
-    num_onsets_final = np.sum(activations == 1.)
+    num_onsets_original = time_indexes.size
+    # onsets are lost when they are rounded to the same index
+    num_onsets_final = np.unique(time_indexes).size
     if warn_lost_onset and (num_onsets_final != num_onsets_original):
         onsets_lost = num_onsets_original - num_onsets_final
         onsets_lost_msg = (
@@ -166,7 +211,8 @@ def activations_to_time_array(activations, input_fs, threshold=0.5, peak_pick=Fa
         activation_indexes, _ = scipy.signal.find_peaks(activations, height=threshold)
         time_array = activation_indexes.astype(float) / float(input_fs)
     else:
-        time_array = np.where(activations > threshold)[0] / float(input_fs)
+        time_array = np.flatnonzero(activations > threshold)
+        time_array = time_array * (1. / float(input_fs))
     return time_array
 
 
@@ -180,10 +226,14 @@ def binary_to_onehot_activations(activations):
     if activations.ndim != 1:
         raise ValueError(
             "The array `activations` must have only one dimension.")
-    activations = np.expand_dims(activations, axis=-1)
-    activations = np.repeat(activations, 2, axis=-1)
-    activations[..., 1] = 1 - activations[..., 1]  # non-onset
-    return activations
+    onehot = np.empty(activations.shape + (2,), dtype=activations.dtype)
+    onehot[..., 0] = activations  # onset
+    # non-onset (the complement of boolean activations is their negation)
+    if activations.dtype == bool:
+        np.logical_not(activations, out=onehot[..., 1])
+    else:
+        np.subtract(1, activations, out=onehot[..., 1])
+    return onehot
 
 
 def onehot_to_binary_activations(activations):
@@ -191,6 +241,9 @@ def onehot_to_binary_activations(activations):
     Convert a bidimensional array containing two activations per time step to
     an unidimensional array, containing a single activation per time step,
     representing the probability of onset.
+
+    The returned array is a (strided) view of the onset column of
+    ``activations``, so no data is copied.
     """
     activations = np.squeeze(activations)
     if activations.ndim != 2:
@@ -201,16 +254,43 @@ def onehot_to_binary_activations(activations):
 
 
 def _activations_to_gaussian(activations, std=0.6, length=5):
-    g = scipy.signal.windows.gaussian(length, std=std)
+    """
+    Replace each activation equal to ``1.0`` by a gaussian window centered on
+    it. Overlapping windows are summed, and the result is clipped to ``1.0``.
+    """
+    g = _gaussian_window(length, std)
     half = length // 2
-    activations_gaussian = np.zeros_like(activations)
-    for ix in np.where(activations==1.)[0]:
-        span = len(activations_gaussian[ix-half:ix-half+length])
-        activations_gaussian[ix-half:ix-half+length] = \
-            np.clip(activations_gaussian[ix-half:ix-half+length] + g[0:span], None, 1.)
+    ix_onsets = np.flatnonzero(activations == 1.)
+
+    if ix_onsets.size * length > activations.size:
+        # dense activations: a single convolution of the impulses with the
+        # window is cheaper than scattering the windows
+        activations_gaussian = np.convolve(activations == 1., g)
+        activations_gaussian = activations_gaussian[
+            half:half + activations.size].astype(activations.dtype)
+    else:
+        # indexes covered by the window of each activation (one row each)
+        ix_windows = ix_onsets[:, np.newaxis] - half + np.arange(length)
+        valid = (ix_windows >= 0) & (ix_windows < len(activations))
+        g_windows = np.broadcast_to(g, ix_windows.shape)
+        activations_gaussian = np.zeros_like(activations)
+        np.add.at(activations_gaussian, ix_windows[valid], g_windows[valid])
+
+    np.minimum(activations_gaussian, 1., out=activations_gaussian)
+
     return activations_gaussian
 
 
+@lru_cache(maxsize=32)
+def _gaussian_window(length, std):
+    """
+    Return a (read-only) gaussian window, cached for each length and std.
+    """
+    g = scipy.signal.windows.gaussian(length, std=std)
+    g.flags.writeable = False
+    return g
+
+
 def _validate_activation_type(activation_type):
     if activation_type not in ('single', 'triangular', 'gaussian'):
         raise ValueError('Invalid value for `activation_type`.')
@@ -2,10 +2,19 @@
 Some useful methods and functions for windowing operations.
 """
 
+from functools import lru_cache
+
+import numpy as np
 import scipy.signal as sig
-from numpy import pad, apply_along_axis
+from numpy import pad
 from numpy.lib.stride_tricks import as_strided
 
+# numpy reductions that can be applied to all the windows at once (along the
+# last axis), instead of being called for each window; other functions are
+# not assumed to have the same semantics for the `axis` argument
+_VECTORIZED_REDUCTIONS = (np.sum, np.mean, np.median, np.amax, np.amin,
+                          np.max, np.min, np.std, np.var, np.prod)
+
 
 def apply_sliding_window(x, window_size, hop_size, function, window_name):
     """
@@ -21,6 +30,9 @@ def apply_sliding_window(x, window_size, hop_size, function, window_name):
     hop_size: int
         Number of samples to be skipped between two successive windowing
         operations.
+    function : function or None
+        Function applied to the data within each window. If None, the
+        (windowed) data of each window is returned.
     window_name : str
         Name of the window function to be used. Options are: {"boxcar",
         "triang", "blackman", "hamming", "hann", "bartlett", "flattop",
@@ -33,22 +45,51 @@ def apply_sliding_window(x, window_size, hop_size, function, window_name):
     """
     view = get_sliding_window_view(x, window_size, hop_size)
 
+    if function is None:
+        # the windows are returned in a single copy (the view is read-only)
+        if window_name:
+            return (view * get_window_function(window_size, window_name)).T
+        return view.copy().T
+
     if window_name:
         window = get_window_function(window_size, window_name)
-        y = apply_along_axis(function, -1, view * window)
+        if function is np.sum or function is np.mean:
+            # the window is applied within the sum (a dot product per window),
+            # so the windowed frames are never materialized
+            y = np.einsum('ij,j->i', view, window)
+            if function is np.mean:
+                y /= window_size
+            return y
+        view = view * window
+
+    if _is_vectorized_reduction(function):
+        y = function(view, axis=-1)
     else:
-        y = apply_along_axis(function, -1, view)
+        # a plain loop over the windows avoids the per-call indexing overhead
+        # of apply_along_axis
+        y = np.array([function(frame) for frame in view])
 
     return y.T
 
 
+def _is_vectorized_reduction(function):
+    """
+    Check whether ``function`` is one of ``_VECTORIZED_REDUCTIONS``. The
+    functions are compared by identity, so arbitrary callables (which might
+    be unhashable, or define a custom equality) are never hashed or compared
+    with ``==``.
+    """
+    return any(function is reduction for reduction in _VECTORIZED_REDUCTIONS)
+
+
 def get_sliding_window_view(x, window_size, hop_size):
     """
     Generate a view of the input array containing the sliding windows obtained
     for the given parameters.
 
     This method only creates a view of the sliding windows; it does not apply a
-    window function (apodization function) to them.
+    window function (apodization function) to them. The windows overlap in
+    memory, so the view is read-only.
 
     Args
     ----
@@ -74,20 +115,26 @@ def get_sliding_window_view(x, window_size, hop_size):
     x = pad(x, (pre_padding_size, post_padding_size), 'constant',
             constant_values=(0, 0))
 
-    # apply striding tricks to create a windowed view of the array
+    # apply striding tricks to create a windowed view of the array (writing to
+    # it would change several windows at once, so it is made read-only)
     view = as_strided(x, shape=(num_hops, window_size),
-                      strides=(x.itemsize * hop_size, x.itemsize))
+                      strides=(x.itemsize * hop_size, x.itemsize),
+                      writeable=False)
 
     return view
 
 
-def get_window_function(window_size, window_name, symmetric=True):
+@lru_cache(maxsize=64)
+def get_window_function(window_size, window_name, symmetric=True, dtype=None):
     """
     Get a window function (also known as tapering function or apodization
     function) according to the specified `window_name`.
 
     This function will return None if the specified `window_name` is also None.
 
+    The windows are cached, since the same window is usually used for many
+    time series; for this reason, the returned array is read-only.
+
     Args
     ----
     window_name : str
@@ -95,7 +142,12 @@ def get_window_function(window_size, window_name, symmetric=True):
         "triang", "blackman", "hamming", "hann", "bartlett", "flattop",
         "parzen", "bohman", "blackmanharris", "nuttall", "barthann",
         "no_window"}.
+    dtype : numpy dtype, optional
+        Data type of the window. The default is double precision.
     """
+    if window_name is None:
+        return None
+
     # check if the window_name is valid
     possible_windows = {
         "boxcar", "triang", "blackman", "hamming", "hann", "bartlett",
@@ -105,11 +157,12 @@ def get_window_function(window_size, window_name, symmetric=True):
 
     if window_name not in possible_windows:
         raise ValueError('invalid window_name: {}'.format(window_name))
-    elif window_name is not None:
-        return sig.get_window(
-            window_name, window_size, fftbins=not symmetric)
-    else:
-        return None
+
+    window = sig.get_window(window_name, window_size, fftbins=not symmetric)
+    if dtype is not None:
+        window = window.astype(dtype)
+    window.flags.writeable = False
+    return window
 
 
 def calculate_sliding_window_parms(window_size, hop_size, array_size):
@@ -0,0 +1,22 @@
+import pytest  # skipcq: PYL-W0611
+
+import numpy as np
+
+from iracema.util.dsp import decimate_mean
+
+
+def test_decimate_mean_incomplete_last_group():
+    array = np.arange(1., 11.)
+    decimated = decimate_mean(array, 4)
+    # the last group (9, 10) is padded with zeros up to 4 samples
+    padded = np.concatenate((array, np.zeros(2)))
+    assert decimated.size == 3
+    assert np.allclose(decimated, padded.reshape(-1, 4).mean(axis=1))
+    assert decimated[-1] == (9. + 10.) / 4
+
+
+def test_decimate_mean_multiple_of_factor():
+    array = np.arange(12.)
+    decimated = decimate_mean(array, 3)
+    assert decimated.size == 4
+    assert np.allclose(decimated, array.reshape(-1, 3).mean(axis=1))
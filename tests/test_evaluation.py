@@ -0,0 +1,24 @@
+import pytest  # skipcq: PYL-W0611
+
+import numpy as np
+
+from iracema.segmentation.evaluation import evaluate_onsets
+
+
+def test_evaluate_onsets():
+    targets = np.array([0.1, 0.5, 1.0, 2.0])
+    predictions = np.array([0.105, 0.11, 0.52, 1.0, 3.0])
+    metrics = evaluate_onsets(targets, predictions, tolerance=0.01)
+    assert metrics['true_positives'] == 2
+    assert metrics['false_negatives'] == 2
+    assert metrics['false_positives'] == 3
+
+
+def test_evaluate_onsets_empty():
+    metrics = evaluate_onsets(np.array([0.1, 0.5]), np.array([]))
+    assert metrics['true_positives'] == 0
+    assert metrics['false_negatives'] == 2
+    assert metrics['false_positives'] == 0
+    assert metrics['precision'] == 0.
+    assert metrics['recall'] == 0.
+    assert metrics['f-measure'] == 0.
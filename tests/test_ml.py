@@ -0,0 +1,70 @@
+import pytest  # skipcq: PYL-W0611
+
+import numpy as np
+import scipy.signal
+
+from iracema.util.ml import (binary_to_onehot_activations,
+                              time_array_to_activations)
+
+
+def _gaussian_reference(ix_onsets, output_length, std=0.6, length=5):
+    # one gaussian window per onset, truncated at the borders of the array
+    g = scipy.signal.windows.gaussian(length, std=std)
+    half = length // 2
+    activations = np.zeros(output_length)
+    for ix in ix_onsets:
+        for j, value in enumerate(g):
+            if 0 <= ix - half + j < output_length:
+                activations[ix - half + j] += value
+    activations = np.minimum(activations, 1.)
+    activations[ix_onsets] = 1.
+    return activations
+
+
+@pytest.mark.parametrize('ix_onsets', [
+    [0],  # first index
+    [19],  # last index
+    [0, 10, 19],
+    [5, 6, 8],  # overlapping windows
+])
+def test_gaussian_activations(ix_onsets):
+    activations = time_array_to_activations(
+        np.array(ix_onsets) / 10., 10, 20, activation_type='gaussian')
+    assert activations.shape == (20,)
+    assert np.allclose(activations, _gaussian_reference(ix_onsets, 20))
+
+
+def test_gaussian_activations_dense():
+    # more onsets than output_length / window length: convolution path
+    ix_onsets = [0, 1, 3, 4, 6, 9]
+    activations = time_array_to_activations(
+        np.array(ix_onsets) / 10., 10, 10, activation_type='gaussian')
+    assert np.allclose(activations, _gaussian_reference(ix_onsets, 10))
+
+
+def test_activations_out_of_range():
+    time_array = np.array([-0.5, 0., 1.9, 2., 3.])
+    with pytest.warns(UserWarning, match='Lost 3 onsets'):
+        activations = time_array_to_activations(time_array, 10, 20)
+    expected = np.zeros(20)
+    expected[[0, 19]] = 1.
+    assert np.array_equal(activations, expected)
+
+    with pytest.warns(UserWarning):
+        activations = time_array_to_activations(
+            time_array, 10, 20, activation_type='gaussian')
+    assert np.allclose(activations, _gaussian_reference([0, 19], 20))
+
+
+@pytest.mark.parametrize('dtype', [bool, np.int8, np.float32])
+def test_onehot_activations_dtype(dtype):
+    # the conversion done by points_to_activations with encoding='onehot'
+    activations = binary_to_onehot_activations(time_array_to_activations(
+        np.array([0., 1., 1.5]), 10, 20, dtype=dtype))
+
+    expected = np.zeros(20, dtype=dtype)
+    expected[[0, 10, 15]] = 1
+    assert activations.dtype == dtype
+    assert activations.shape == (20, 2)
+    assert np.array_equal(activations[:, 0], expected)
+    assert np.array_equal(activations[:, 1], 1 - expected.astype(np.int8))
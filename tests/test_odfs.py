@@ -0,0 +1,80 @@
+import pytest  # skipcq: PYL-W0611
+
+import numpy as np
+
+import iracema as ir
+from iracema.segmentation.odfs import (_accumulate_positive_runs,
+                                       _rms_shared_cumsum, odf_rms_derivative)
+from iracema.segmentation.onsets import extract_from_odf
+
+
+def _accumulate_positive_runs_loop(data):
+    # sample by sample version of ``_accumulate_positive_runs``
+    accumulated = np.zeros_like(data)
+    last, sum_, pk, ix_pk = 0, 0, 0, 0
+    for ix, x in enumerate(data):
+        if x > 0:
+            sum_ += x
+            if x > pk:
+                pk = x
+                ix_pk = ix
+        else:
+            if last > 0:
+                accumulated[ix_pk] = sum_
+            sum_ = 0
+            pk = 0
+        last = x
+    return accumulated
+
+
+@pytest.mark.parametrize('data', [
+    [1., 2., 0., 0., 3., 1., 3., 0., 2.],  # runs at the start and end
+    [0., 0., 5., 0.],
+    [1., 2., 3.],  # all positive
+    [0., 0., 0.],
+    [-1., -2., -3.],  # all negative
+    [2., -1., 1., 4., 4., -2.],
+    [],
+])
+def test_accumulate_positive_runs(data):
+    data = np.array(data)
+    assert np.allclose(_accumulate_positive_runs(data),
+                       _accumulate_positive_runs_loop(data))
+
+
+def test_accumulate_positive_runs_random():
+    data = np.random.default_rng(0).normal(size=10000)
+    assert np.allclose(_accumulate_positive_runs(data),
+                       _accumulate_positive_runs_loop(data))
+
+
+def test_rms_shared_cumsum_single_precision():
+    rng = np.random.default_rng(0)
+    # a loud passage followed by a quiet one, in which the rounding errors of
+    # a single precision cumulative sum would dominate the frame energies
+    data = np.concatenate((rng.uniform(-1, 1, 200000),
+                           rng.uniform(-1e-3, 1e-3, 20000)))
+    audio = ir.Audio(44100, data.astype(np.float32))
+
+    rms_list = _rms_shared_cumsum(audio, (4096, 512), 512)
+
+    for window_size, rms in zip((4096, 512), rms_list):
+        expected = ir.features.rms(audio.copy(), window_size, 512)
+        assert rms.data.dtype == np.float32
+        assert rms.fs == expected.fs
+        assert rms.nsamples == expected.nsamples
+        assert np.allclose(rms.data, expected.data, rtol=1e-4, atol=1e-7)
+
+
+def test_extract_from_odf_returns_odf_data():
+    rng = np.random.default_rng(0)
+    audio = ir.Audio(44100, rng.uniform(-1, 1, 44100))
+
+    onsets, odf_data = extract_from_odf(audio, odf_rms_derivative,
+                                        window=1024, hop=512)
+
+    expected = odf_rms_derivative(audio, window=1024, hop=512)
+    assert isinstance(onsets, ir.PointList)
+    assert isinstance(odf_data, ir.TimeSeries)
+    assert odf_data.fs == expected.fs
+    assert np.array_equal(odf_data.data, expected.data)
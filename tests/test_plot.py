@@ -0,0 +1,40 @@
+import pytest  # skipcq: PYL-W0611
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # pylint: disable=wrong-import-position
+import numpy as np  # pylint: disable=wrong-import-position
+
+import iracema as ir  # pylint: disable=wrong-import-position
+
+
+@pytest.fixture
+def shown(monkeypatch):
+    calls = []
+    monkeypatch.setattr(plt, 'show', lambda: calls.append('plt.show'))
+    monkeypatch.setattr(matplotlib.figure.Figure, 'show',
+                        lambda self: calls.append('figure.show'))
+    yield calls
+    plt.close('all')
+
+
+@pytest.fixture(scope="module")
+def noise():
+    return ir.Audio(8000, np.random.default_rng(0).uniform(-1, 1, 8000))
+
+
+def test_blocking_show(shown, noise):
+    ir.plot.line_plot(noise)
+    ir.plot.waveform_trio(noise)
+    ir.plot.waveform_trio_and_features(noise, features=(noise,))
+    assert shown == ['plt.show', 'plt.show', 'plt.show']
+
+
+def test_reused_figure_is_not_shown(shown, noise):
+    fig = plt.figure()
+    ir.plot.line_plot(noise, fig=fig)
+    ir.plot.waveform_trio(noise, fig=fig)
+    ir.plot.waveform_trio_and_features(noise, features=(noise,), fig=fig)
+    assert not shown
+    # the cursor must be kept alive by the figure
+    assert fig.multi_cursor is not None
@@ -9,3 +9,7 @@ def test_numpy_conversion():
     points = ir.PointList.from_numpy(points_array)
     new_points_array = points.to_numpy()
     assert np.all(points_array == new_points_array)
+
+def test_numpy_scalars():
+    assert ir.Point(np.int64(3)) == ir.Point(3)
+    assert ir.Point(np.float32(1.5)) == ir.Point(1.5)
@@ -0,0 +1,109 @@
+import pytest  # skipcq: PYL-W0611
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+import iracema as ir
+from iracema.segmentation.util import three_sliced_mel_spectrograms
+
+
+def _three_sliced_mel_spectrograms_reference(audio, window, hop,
+                                            frames_per_slice, **kwargs):
+    # the original implementation, based on three MelSpectrogram objects
+    mel_spec_short, mel_spec_medium, mel_spec_long = [
+        ir.spectral.MelSpectrogram(audio, window_size, hop, **kwargs)
+        for window_size in (window, window * 2, window * 4)
+    ]
+    pad_len = np.floor_divide(frames_per_slice, 2)
+    long_len = mel_spec_long.data.shape[1]
+    mel_spec_short = mel_spec_short.pad(
+        pad_len, pad_len + long_len - mel_spec_short.data.shape[1],
+        value='repeat')
+    mel_spec_medium = mel_spec_medium.pad(
+        pad_len, pad_len + long_len - mel_spec_medium.data.shape[1],
+        value='repeat')
+    mel_spec_long = mel_spec_long.pad(pad_len, pad_len, value='repeat')
+
+    data = np.stack(
+        [mel_spec_short.data, mel_spec_medium.data, mel_spec_long.data])
+    nchannels, nfrequencies, ntime = data.shape
+    nslices = ntime - 2 * pad_len
+    new_shape = (nchannels, nfrequencies, frames_per_slice, nslices)
+    strides = (nfrequencies * ntime * data.itemsize, ntime * data.itemsize,
+               data.itemsize, data.itemsize)
+    data = as_strided(data, shape=new_shape, strides=strides)
+
+    return data.T, float(mel_spec_short.fs)
+
+
+@pytest.fixture(scope="module")
+def noise():
+    return ir.Audio(8000, np.random.default_rng(0).uniform(-1, 1, 8000))
+
+
+def test_multi_window_mel_data(noise):
+    data_list, fs = ir.spectral.multi_window_mel_data(
+        noise, (256, 512, 1024), 128, n_mels=64)
+
+    for window_size, data in zip((256, 512, 1024), data_list):
+        mel_spec = ir.spectral.MelSpectrogram(noise, window_size, 128,
+                                              n_mels=64)
+        assert fs == mel_spec.fs
+        assert np.allclose(data, mel_spec.data)
+
+
+def test_three_sliced_mel_spectrograms(noise):
+    frames_per_slice = 15
+    pad_len = frames_per_slice // 2
+    data, fs = three_sliced_mel_spectrograms(
+        noise, 256, 128, frames_per_slice=frames_per_slice, n_mels=64)
+
+    mel_specs = [
+        ir.spectral.MelSpectrogram(noise, window_size, 128, n_mels=64)
+        for window_size in (256, 512, 1024)
+    ]
+    long_len = mel_specs[-1].nsamples
+    channels = np.stack([
+        mel_spec.pad(pad_len, pad_len + long_len - mel_spec.nsamples,
+                     value='repeat').data for mel_spec in mel_specs
+    ], axis=-1)
+
+    assert fs == float(mel_specs[0].fs)
+    assert data.dtype == np.float64
+    assert data.shape == (long_len, frames_per_slice, 64, 3)
+    for ix_slice in (0, long_len // 2, long_len - 1):
+        expected = channels[:, ix_slice:ix_slice + frames_per_slice]
+        assert np.allclose(data[ix_slice], expected.transpose(1, 0, 2))
+
+
+@pytest.mark.parametrize('frames_per_slice', [15, 4])
+def test_three_sliced_mel_spectrograms_reference(noise, frames_per_slice):
+    data, fs = three_sliced_mel_spectrograms(
+        noise, 256, 128, frames_per_slice=frames_per_slice, n_mels=64)
+    expected, expected_fs = _three_sliced_mel_spectrograms_reference(
+        noise, 256, 128, frames_per_slice, n_mels=64)
+
+    assert fs == expected_fs
+    assert data.shape == expected.shape
+    assert np.allclose(data, expected)
+
+
+def test_three_sliced_mel_spectrograms_single_precision(noise):
+    data, _ = three_sliced_mel_spectrograms(noise, 256, 128, n_mels=64)
+    data_single, _ = three_sliced_mel_spectrograms(noise, 256, 128, n_mels=64,
+                                                   dtype=np.float32)
+    assert data_single.dtype == np.float32
+    assert np.allclose(data_single, data, rtol=1e-4)
+
+
+def test_three_sliced_mel_spectrograms_fft_len(noise):
+    data, _ = three_sliced_mel_spectrograms(noise, 256, 128, n_mels=64,
+                                            fft_len=2048, htk=True)
+
+    for channel, window_size in enumerate((256, 512, 1024)):
+        mel_spec = ir.spectral.MelSpectrogram(noise, window_size, 128,
+                                              n_mels=64, fft_len=2048,
+                                              htk=True)
+        # the central frame of each slice
+        assert np.allclose(data[:mel_spec.nsamples, 7, :, channel],
+                           mel_spec.data.T)
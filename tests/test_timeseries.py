@@ -1,7 +1,12 @@
+import pickle
+from decimal import Decimal
+
 import pytest  # skipcq: PYL-W0611
 
 import numpy as np
 
+import iracema as ir
+
 
 def test_resample(audio00):
     resampled_audio = audio00.resample(10000)
@@ -18,3 +23,73 @@ def test_pad_spectrogram(spectrogram00):
     assert padded_spectrogram.nsamples == spectrogram00.nsamples+10
     assert np.all(padded_spectrogram.data[...,0] == spectrogram00.data[...,0])
     assert np.all(padded_spectrogram.data[...,-1] == spectrogram00.data[...,-1])
+
+def test_features_not_cached_by_default():
+    ts = ir.TimeSeries(100, data=np.arange(1000.))
+    rms = ir.features.rms(ts, 10, 10)
+
+    ts.data *= 2
+    assert np.allclose(ir.features.rms(ts, 10, 10).data, rms.data * 2)
+    assert '_features_cache' not in ts.__dict__
+
+def test_cached_features_invalidation():
+    ts = ir.TimeSeries(100, data=np.arange(1000.))
+    rms = ir.features.rms(ts, 10, 10, cache=True)
+
+    ts.data = ts.data * 2
+    assert np.allclose(ir.features.rms(ts, 10, 10, cache=True).data,
+                       rms.data * 2)
+
+    ts.fs = Decimal(200)
+    assert ir.features.rms(ts, 10, 10, cache=True).fs == 20
+
+    ts.start_time = Decimal(1)
+    assert ir.features.rms(ts, 10, 10, cache=True).start_time == 1
+
+def test_cached_time_invalidation():
+    ts = ir.TimeSeries(100, data=np.zeros(10))
+    assert ts.time[-1] == pytest.approx(0.09)
+
+    ts.fs = Decimal(10)
+    assert ts.time[-1] == pytest.approx(0.9)
+
+    ts.start_time = Decimal(2)
+    assert ts.time[0] == 2
+
+    ts.data = np.zeros(20)
+    assert ts.time.size == 20
+
+def test_cached_db_data_invalidation():
+    audio = ir.Audio(8000, np.random.default_rng(0).uniform(-1, 1, 8000))
+    spec = ir.spectral.Spectrogram(audio, 256, 128)
+    db_data = ir.plot._spectrogram_db_data(spec)
+    assert ir.plot._spectrogram_db_data(spec) is db_data
+
+    # power spectrogram: a factor of 10 corresponds to 10 dB
+    spec.data = spec.data * 10
+    assert np.allclose(ir.plot._spectrogram_db_data(spec), db_data + 10,
+                       atol=1e-3)
+
+def test_caches_not_copied():
+    ts = ir.TimeSeries(100, data=np.arange(1000.))
+    ir.features.rms(ts, 10, 10, cache=True)
+    ts.time  # pylint: disable=pointless-statement
+    ts._db_data_cache = (ts.data, ts.data)
+
+    for other in (ts.copy(), pickle.loads(pickle.dumps(ts))):
+        for attribute in ts._cache_attributes:
+            assert attribute not in other.__dict__
+        assert np.array_equal(other.data, ts.data)
+        assert other.fs == ts.fs
+
+def test_normalize_negative_peak():
+    ts = ir.TimeSeries(100, data=np.array([0.1, -0.8, 0.4, -0.2]))
+    normalized = ts.normalize()
+    assert np.allclose(normalized.data, [0.125, -1., 0.5, -0.25])
+
+    normalized = ts.normalize(db=-6.)
+    assert np.max(np.abs(normalized.data)) == pytest.approx(10**(-6 / 20))
+    assert normalized.data[1] < 0
+
+    single = ir.TimeSeries(100, data=ts.data.astype(np.float32)).normalize()
+    assert single.data.dtype == np.float32
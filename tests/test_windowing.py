@@ -0,0 +1,60 @@
+import pytest  # skipcq: PYL-W0611
+
+import numpy as np
+
+from iracema.util.windowing import (apply_sliding_window,
+                                    get_sliding_window_view,
+                                    get_window_function)
+
+
+def test_apply_sliding_window_without_function():
+    x = np.arange(20.)
+    view = get_sliding_window_view(x, 8, 4)
+
+    y = apply_sliding_window(x, 8, 4, None, None)
+    assert np.array_equal(y, view.T)
+    assert y.flags.writeable
+    assert not np.shares_memory(y, x)
+
+    y = apply_sliding_window(x, 8, 4, None, 'hann')
+    assert np.allclose(y, (view * get_window_function(8, 'hann')).T)
+
+
+def test_apply_sliding_window_custom_function():
+    x = np.random.default_rng(0).normal(size=100)
+    view = get_sliding_window_view(x, 16, 8)
+
+    y = apply_sliding_window(x, 16, 8, lambda frame: frame[0] - frame[-1],
+                             None)
+    assert np.allclose(y, view[:, 0] - view[:, -1])
+
+
+def test_apply_sliding_window_unhashable_function():
+    class Peak:
+        # callables defining __eq__ without __hash__ are unhashable
+        def __eq__(self, other):
+            return NotImplemented
+
+        def __call__(self, frame):
+            return np.max(np.abs(frame))
+
+    x = np.random.default_rng(0).normal(size=100)
+    view = get_sliding_window_view(x, 16, 8)
+
+    y = apply_sliding_window(x, 16, 8, Peak(), 'hann')
+    windowed = view * get_window_function(16, 'hann')
+    assert np.allclose(y, np.max(np.abs(windowed), axis=-1))
+
+
+def test_apply_sliding_window_function_with_axis():
+    # functions with an `axis` argument that are not reductions over it must
+    # still be applied to each window
+    x = np.array([1., 1., 2., 2., 3., 3., 3., 4.])
+    view = get_sliding_window_view(x, 4, 2)
+
+    y = apply_sliding_window(x, 4, 2, lambda frame, axis=None: np.unique(
+        frame, axis=axis).size, None)
+    assert np.array_equal(y, [np.unique(frame).size for frame in view])
+
+    y = apply_sliding_window(x, 4, 2, np.max, None)
+    assert np.array_equal(y, np.max(view, axis=-1))